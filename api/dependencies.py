@@ -0,0 +1,49 @@
+"""
+Dependencias compartidas por los routers de simulación y MTC.
+
+Un solo DataLoader, DataProcessor y NetworkCacheManager por proceso: el
+DataFrame unificado, los frames por día y las redes se cargan (y ocupan
+memoria) una sola vez, y la precarga al iniciar beneficia a ambos routers.
+"""
+import threading
+from typing import Tuple
+
+from src.core.config import PATHS, SIM_CONFIG
+from src.data.loader import DataLoader
+from src.data.processor import DataProcessor
+from src.core.graph import ContactGraphBuilder
+from src.core.network_cache import NetworkCacheManager
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_loader = None
+_processor = None
+_graph_builder = None
+_network_cache = None
+_lock = threading.Lock()  # Los routers las piden desde varios hilos de sus executors
+
+
+def get_dependencies() -> Tuple[DataLoader, DataProcessor, ContactGraphBuilder, NetworkCacheManager]:
+    """Inicializa (una sola vez) y retorna las dependencias globales."""
+    global _loader, _processor, _graph_builder, _network_cache
+
+    with _lock:
+        if _loader is None:
+            _processor = DataProcessor()
+            _graph_builder = ContactGraphBuilder()
+            _network_cache = NetworkCacheManager(_graph_builder, persist_dir=PATHS.CACHE_DIR)
+            _loader = DataLoader(PATHS.estudiantes, PATHS.clases, PATHS.asistencias)
+            logger.info("Dependencias compartidas inicializadas")
+
+    return _loader, _processor, _graph_builder, _network_cache
+
+
+def preload_data():
+    """Precarga los DataFrames por día, el índice de estudiantes y las redes diarias (al iniciar la app)."""
+    loader, processor, _, network_cache = get_dependencies()
+    daily_dataframes = processor.get_daily_dataframes(loader)
+    processor.get_student_index(loader)
+    network_cache.prebuild({dia: daily_dataframes[dia] for dia in SIM_CONFIG.dias_semana},
+                           version=loader.get_data_version())
+    logger.info("Datos y redes diarias precargados")
@@ -0,0 +1,40 @@
+"""
+Utilidades de cache HTTP (ETag / Cache-Control) para los routers.
+
+Las respuestas de análisis dependen solo de los parámetros y de los CSV,
+por lo que el ETag se deriva de ambos y los clientes pueden revalidar con
+If-None-Match sin que el servidor recalcule nada.
+"""
+import hashlib
+from fastapi import Request, Response
+
+CACHE_CONTROL = "public, max-age=300"
+
+
+def compute_etag(*parts) -> str:
+    """ETag fuerte (entre comillas) a partir de las partes que determinan la respuesta."""
+    digest = hashlib.md5("|".join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Indica si el cliente ya tiene la versión actual (If-None-Match)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def set_cache_headers(response: Response, etag: str):
+    """Adjunta ETag y Cache-Control a la respuesta."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """Respuesta 304 sin cuerpo para clientes con la versión vigente."""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag)
+    return response
@@ -3,21 +3,25 @@ Router de MTC (Minimum Spanning Tree)
 
 Endpoints para análisis MTC de la red de contactos.
 """
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Dict, Tuple
+from pydantic import BaseModel, field_serializer
 import sys
 from pathlib import Path
-import uuid
+import numpy as np
+import hashlib
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.core.config import PATHS, SIM_CONFIG
-from src.data.loader import DataLoader
-from src.data.processor import DataProcessor
-from src.core.graph import ContactGraphBuilder
-from src.analysis import DailyGraphAnalysisCoordinator
+from src.core.config import SIM_CONFIG
+from src.analysis.mst_analyzer import MSTAnalyzer
+from src.utils.helpers import top_k_indices
+from api.dependencies import get_dependencies  # Compartidas con el router de simulación
+from api.http_cache import compute_etag, etag_matches, set_cache_headers, not_modified
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -46,6 +50,11 @@ class CriticalEdge(BaseModel):
     estudiante_b: str
     peso: float
     interpretacion: str
+    
+    @field_serializer('peso')
+    def _round_peso(self, peso: float) -> float:
+        """Redondea solo al serializar (no en la construcción)."""
+        return round(peso, 2)
 
 
 class BridgeNode(BaseModel):
@@ -54,6 +63,11 @@ class BridgeNode(BaseModel):
     grado: int
     betweenness: float
     interpretacion: str
+    
+    @field_serializer('betweenness')
+    def _round_betweenness(self, betweenness: float) -> float:
+        """Redondea solo al serializar (no en la construcción)."""
+        return round(betweenness, 4)
 
 
 class CriticalNode(BaseModel):
@@ -63,6 +77,11 @@ class CriticalNode(BaseModel):
     grado: int
     betweenness: float
     interpretacion: str
+    
+    @field_serializer('betweenness')
+    def _round_betweenness(self, betweenness: float) -> float:
+        """Redondea solo al serializar (no en la construcción)."""
+        return round(betweenness, 4)
 
 
 class MTCInfo(BaseModel):
@@ -91,22 +110,31 @@ class MTCInfo(BaseModel):
 # Almacenamiento en memoria
 # ============================================================================
 
-_mtc_results: Dict[str, Dict[str, Any]] = {}
-_loader = None
-_processor = None
-_graph_builder = None
+# Cache de resultados: (weight_mode, dia, versión de los CSV) → MTCInfo
+_mtc_cache: Dict[Tuple[str, str, Tuple[float, ...]], MTCInfo] = {}
+_mtc_cache_lock = threading.Lock()  # Lecturas/escrituras desde los hilos de _MTC_EXECUTOR
 
+# Pool dedicado para el análisis CPU-bound (no bloquear el event loop)
+_MTC_EXECUTOR = ThreadPoolExecutor(max_workers=2)
 
-def get_dependencies():
-    """Inicializa y retorna dependencias globales."""
-    global _loader, _processor, _graph_builder
-    
-    if _loader is None:
-        _loader = DataLoader(PATHS.estudiantes, PATHS.clases, PATHS.asistencias)
-        _processor = DataProcessor()
-        _graph_builder = ContactGraphBuilder()
-    
-    return _loader, _processor, _graph_builder
+
+def _content_id(weight_mode: str, dia: str,
+                u_arr: np.ndarray, v_arr: np.ndarray, w_arr: np.ndarray) -> str:
+    """ID estable del análisis: BLAKE2b de parámetros + aristas del MST."""
+    h = hashlib.blake2b(f"{weight_mode}|{dia}".encode(), digest_size=16)
+    h.update("|".join(map(str, u_arr)).encode())
+    h.update("|".join(map(str, v_arr)).encode())
+    h.update(w_arr.tobytes())
+    return h.hexdigest()
+
+
+def _validate_params(weight_mode: str, dia: str):
+    """Valida los parámetros del análisis (400 si no son válidos)."""
+    if dia not in SIM_CONFIG.dias_semana:
+        raise HTTPException(status_code=400, detail=f"Día inválido. Opciones: {', '.join(SIM_CONFIG.dias_semana)}")
+    if weight_mode not in MSTAnalyzer.WEIGHT_MODES:
+        raise HTTPException(status_code=400,
+                            detail=f"Modo de pesos inválido. Opciones: {', '.join(MSTAnalyzer.WEIGHT_MODES)}")
 
 
 # ============================================================================
@@ -114,12 +142,15 @@ def get_dependencies():
 # ============================================================================
 
 @router.get("/mtc/analyze", response_model=MTCInfo)
-async def analyze_mtc(weight_mode: str = "inverse", dia: str = "Lunes"):
+async def analyze_mtc(request: Request, weight_mode: str = "inverse", dia: str = "Lunes"):
     """
     Analiza la red de contactos y retorna información del MST directamente.
     
     Este endpoint es independiente de las simulaciones y puede ejecutarse
     en cualquier momento para obtener análisis de la estructura de la red.
+    El cálculo (CPU-bound) se ejecuta en un pool de hilos para no bloquear
+    el event loop. La respuesta lleva ETag (parámetros + versión de los CSV),
+    por lo que las revalidaciones con If-None-Match responden 304.
     
     Args:
         weight_mode: 'inverse' (default) o 'direct' para pesos del MST
@@ -128,76 +159,96 @@ async def analyze_mtc(weight_mode: str = "inverse", dia: str = "Lunes"):
     Returns:
         MTCInfo con métricas del MST
     """
+    # Validar antes del ETag: If-None-Match: * no debe responder 304 a parámetros inválidos
+    _validate_params(weight_mode, dia)
+    try:
+        loader, _, _, _ = get_dependencies()
+        etag = compute_etag(loader.get_data_version(), weight_mode, dia)
+    except Exception as e:
+        logger.error(f"Error en análisis MTC: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error en análisis MTC: {str(e)}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    loop = asyncio.get_running_loop()
+    mtc_info = await loop.run_in_executor(_MTC_EXECUTOR, _analyze_mtc_sync, weight_mode, dia)
+    # Serializar directamente a bytes con pydantic-core (sin jsonable_encoder)
+    json_response = Response(content=mtc_info.model_dump_json(), media_type="application/json")
+    set_cache_headers(json_response, etag)
+    return json_response
+
+
+def _analyze_mtc_sync(weight_mode: str, dia: str) -> MTCInfo:
+    """Ejecuta el análisis MTC de forma síncrona (ver analyze_mtc)."""
     try:
         # Obtener dependencias
-        loader, processor, graph_builder = get_dependencies()
+        loader, processor, _, network_cache = get_dependencies()
         
-        # Cargar datos
-        estudiantes, clases, asistencias = loader.load_all()
-        df_unificado = processor.create_unified_dataframe(estudiantes, clases, asistencias)
+        # Resultado cacheado (el análisis solo depende de los parámetros y los CSV)
+        version = loader.get_data_version()
+        cache_key = (weight_mode, dia, version)
+        with _mtc_cache_lock:
+            cached = _mtc_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        # Crear coordinador de análisis
-        coordinator = DailyGraphAnalysisCoordinator(weight_mode=weight_mode)
+        # Validar parámetros
+        _validate_params(weight_mode, dia)
         
-        # Validar día
-        if dia not in SIM_CONFIG.dias_semana:
-            raise HTTPException(status_code=400, detail=f"Día inválido. Opciones: {', '.join(SIM_CONFIG.dias_semana)}")
-        
-        # Filtrar datos por día seleccionado
-        df_dia = processor.filter_by_day(df_unificado, dia)
+        # Datos del día (precargados y cacheados en el processor)
+        df_dia = processor.get_daily_dataframes(loader)[dia]
         
         if len(df_dia) == 0:
             raise HTTPException(status_code=404, detail=f"No hay datos disponibles para {dia}")
         
-        # Construir grafo del día
-        G_dia = graph_builder.build_daily_graph(df_dia)
-            
-        # Analizar MST
-        results = coordinator.run_all_analyses(G_dia)
-        mst_data = results['mst']
+        # Grafo del día + MST (cacheado en memoria y disco por día/modo/versión)
+        mst_data = network_cache.get_mst(dia, weight_mode, df_dia, version)
         mst_graph = mst_data['mst']
         
-        # Generar ID único para este análisis
-        mtc_id = str(uuid.uuid4())
+        # ID determinista derivado del contenido del MST (mismo análisis → mismo ID)
+        u_arr, v_arr, w_arr = mst_data['critical_edges_arr']
+        mtc_id = _content_id(weight_mode, dia, u_arr, v_arr, w_arr)
         
         # Extraer top 10 aristas críticas (contactos más fuertes)
         critical_edges = []
-        for u, v, peso in mst_data['critical_edges'][:10]:
+        for i in top_k_indices(w_arr, 10):
+            u, v, peso = u_arr[i], v_arr[i], float(w_arr[i])
             interpretacion = "Contacto muy frecuente" if peso > 5 else "Contacto frecuente" if peso > 2 else "Contacto moderado"
-            critical_edges.append(CriticalEdge(
+            critical_edges.append(CriticalEdge.model_construct(
                 estudiante_a=str(u),
                 estudiante_b=str(v),
-                peso=round(peso, 2),
+                peso=peso,
                 interpretacion=interpretacion
             ))
         
         # Identificar nodos puente (clave para conectividad)
-        import networkx as nx
-        betweenness = nx.betweenness_centrality(mst_graph)
-        degree = dict(mst_graph.degree())
+        node_ids, bc_arr, deg_arr = mst_data['centrality_arr']  # Calculados una sola vez por MSTAnalyzer
         
-        # Top 10 nodos puente (legacy compatibility)
-        bridge_nodes = []
-        sorted_nodes = sorted(betweenness.items(), key=lambda x: x[1], reverse=True)[:10]
-        for node_id, bc in sorted_nodes:
-            deg = degree.get(node_id, 0)
-            if bc > 0:
-                interpretacion = "Super-conector crítico" if bc > 0.1 else "Conector importante" if bc > 0.05 else "Conector"
-                bridge_nodes.append(BridgeNode(
-                    estudiante_id=str(node_id),
-                    grado=deg,
-                    betweenness=round(bc, 4),
-                    interpretacion=interpretacion
-                ))
+        # Top 10 nodos puente (legacy compatibility); selección e interpretación vectorizadas
+        top_idx = top_k_indices(bc_arr, 10)
+        top_idx = top_idx[bc_arr[top_idx] > 0]
+        top_bc = bc_arr[top_idx]
+        interpretaciones = np.select([top_bc > 0.1, top_bc > 0.05],
+                                     ["Super-conector crítico", "Conector importante"],
+                                     default="Conector")
+        bridge_nodes = [
+            BridgeNode.model_construct(
+                estudiante_id=str(node_ids[i]),
+                grado=int(deg_arr[i]),
+                betweenness=float(bc_arr[i]),
+                interpretacion=str(interp)
+            )
+            for i, interp in zip(top_idx, interpretaciones)
+        ]
         
         # NEW: Get critical nodes from analyzer (vulnerable + bridge classification)
         critical_nodes_data = mst_data.get('critical_nodes', [])
         critical_nodes = [
-            CriticalNode(
+            CriticalNode.model_construct(
                 estudiante_id=node['estudiante_id'],
                 tipo=node['tipo'],
                 grado=node['grado'],
-                betweenness=round(node['betweenness'], 4),
+                betweenness=node['betweenness'],
                 interpretacion=node['interpretacion']
             )
             for node in critical_nodes_data
@@ -214,10 +265,10 @@ async def analyze_mtc(weight_mode: str = "inverse", dia: str = "Lunes"):
             f"transmisión más probables en caso de epidemia."
         )
         
-        return MTCInfo(
+        mtc_info = MTCInfo(
             mtc_id=mtc_id,
             num_nodos=num_nodos,
-            num_aristas_originales=G_dia.number_of_edges(),
+            num_aristas_originales=mst_data['num_aristas_originales'],
             num_aristas_mst=num_aristas,
             peso_total_mst=mst_data['total_weight'],
             peso_promedio=mst_data['avg_weight'],
@@ -228,6 +279,13 @@ async def analyze_mtc(weight_mode: str = "inverse", dia: str = "Lunes"):
             nodos_criticos=critical_nodes,  # NEW
             interpretacion=interpretacion
         )
+        
+        # Los resultados de otras versiones de los CSV ya no se pueden servir
+        with _mtc_cache_lock:
+            for stale in [k for k in _mtc_cache if k[2] != version]:
+                _mtc_cache.pop(stale, None)
+            _mtc_cache[cache_key] = mtc_info
+        return mtc_info
     
     except HTTPException:
         raise
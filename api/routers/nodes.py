@@ -3,11 +3,15 @@ Router de Nodos - Visualización
 
 Endpoints para obtener información de nodos (estudiantes) para visualización 3D.
 """
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
+import pandas as pd
+import os
 import sys
 from pathlib import Path
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -15,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.data.loader import DataLoader
 from src.core.config import PATHS
 from src.utils.logger import get_logger
+from api.http_cache import compute_etag, etag_matches, set_cache_headers, not_modified
 
 logger = get_logger(__name__)
 
@@ -52,6 +57,15 @@ class StudentsResponse(BaseModel):
 # Instancia global del loader (singleton para eficiencia)
 _loader = None
 
+# Pool para la carga de CSV (no bloquear el event loop)
+_NODES_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+# Estudiantes e índice id → fila: (mtime de estudiantes.csv, DataFrame, índice)
+_students_table: Optional[Tuple[float, pd.DataFrame, Dict[str, int]]] = None
+
+# JSON precalculado de /nodes: (mtime de estudiantes.csv, bytes)
+_nodes_json: Optional[Tuple[float, bytes]] = None
+
 
 def get_loader() -> DataLoader:
     """Obtiene o crea instancia del DataLoader."""
@@ -66,37 +80,66 @@ def get_loader() -> DataLoader:
     return _loader
 
 
+def _get_students_table(loader: DataLoader) -> Tuple[float, pd.DataFrame, Dict[str, int]]:
+    """Retorna (versión, estudiantes, índice id → fila), recargando solo si cambia el CSV."""
+    global _students_table
+    
+    version = os.path.getmtime(loader.estudiantes_path)
+    if _students_table is None or _students_table[0] != version:
+        estudiantes, _, _ = loader.load_all()
+        id_to_row = {sid: row for row, sid in enumerate(estudiantes['id_estudiante'].tolist())}
+        _students_table = (version, estudiantes, id_to_row)
+    
+    return _students_table
+
+
+def _student_records(estudiantes: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convierte estudiantes a registros {id, nombre, carrera, anio_ingreso} sin iterrows."""
+    df = estudiantes[['id_estudiante', 'nombre', 'carrera', 'anio_ingreso']].astype(
+        {'anio_ingreso': 'int64'}
+    )
+    return df.rename(columns={'id_estudiante': 'id'}).to_dict(orient='records')
+
+
 @router.get("/nodes", response_model=NodesResponse)
-async def get_all_nodes():
+async def get_all_nodes(request: Request):
     """
     Obtiene todos los nodos (estudiantes) para visualización.
     
     Retorna información básica de cada estudiante sin aristas.
     Los nodos se visualizarán en una esfera 3D en el frontend.
+    Incluye ETag (versión de estudiantes.csv) para revalidación con 304.
     
     Returns:
         NodesResponse con lista de estudiantes
     """
     try:
-        loader = get_loader()
-        estudiantes, _, _ = loader.load_all()
-        
-        nodes = [
-            StudentNode(
-                id=str(row['id_estudiante']),
-                nombre=row['nombre'],
-                carrera=row['carrera'],
-                anio_ingreso=int(row['anio_ingreso'])
-            )
-            for _, row in estudiantes.iterrows()
-        ]
+        etag = compute_etag(os.path.getmtime(get_loader().estudiantes_path))
+    except Exception as e:
+        logger.error(f"Error al obtener nodos: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al cargar nodos: {str(e)}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(_NODES_EXECUTOR, _get_all_nodes_sync)
+    set_cache_headers(response, etag)
+    return response
+
+
+def _get_all_nodes_sync() -> Response:
+    """Construye (o reutiliza) el JSON de get_all_nodes de forma síncrona."""
+    global _nodes_json
+    
+    try:
+        version, estudiantes, _ = _get_students_table(get_loader())
         
-        # Retornando nodos
+        if _nodes_json is None or _nodes_json[0] != version:
+            nodes = [StudentNode.model_construct(**record) for record in _student_records(estudiantes)]
+            content = NodesResponse(total=len(nodes), nodes=nodes).model_dump_json().encode()
+            _nodes_json = (version, content)
         
-        return NodesResponse(
-            total=len(nodes),
-            nodes=nodes
-        )
+        return Response(content=_nodes_json[1], media_type='application/json')
     
     except Exception as e:
         logger.error(f"Error al obtener nodos: {str(e)}")
@@ -114,27 +157,27 @@ async def get_students(ids: str = None):
     Returns:
         StudentsResponse with detailed student information
     """
+    loop = asyncio.get_running_loop()
+    students = await loop.run_in_executor(_NODES_EXECUTOR, _get_students_sync, ids)
+    # Serializar directamente a bytes con pydantic-core (sin jsonable_encoder)
+    return Response(content=students.model_dump_json(), media_type="application/json")
+
+
+def _get_students_sync(ids: str = None) -> StudentsResponse:
+    """Construye la respuesta de get_students de forma síncrona."""
     try:
-        loader = get_loader()
-        estudiantes, _, _ = loader.load_all()
+        _, estudiantes, id_to_row = _get_students_table(get_loader())
         
         if ids:
             # Parse comma-separated IDs
             id_list = [id.strip() for id in ids.split(',')]
-            # Filter estudiantes by IDs (convert both to string for comparison)
-            filtered = estudiantes[estudiantes['id_estudiante'].astype(str).isin(id_list)]
+            # Lookup O(|ids|) en el índice (sin duplicados, en el orden del CSV)
+            rows = sorted({id_to_row[sid] for sid in id_list if sid in id_to_row})
+            filtered = estudiantes.iloc[rows]
         else:
             filtered = estudiantes
         
-        students = [
-            StudentDetail(
-                id=str(row['id_estudiante']),
-                nombre=row['nombre'],
-                carrera=row['carrera'],
-                anio_ingreso=int(row['anio_ingreso'])
-            )
-            for _, row in filtered.iterrows()
-        ]
+        students = [StudentDetail.model_construct(**record) for record in _student_records(filtered)]
         
         return StudentsResponse(
             total=len(students),
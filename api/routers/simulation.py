@@ -11,19 +11,19 @@ from pathlib import Path
 import uuid
 import time
 import numpy as np
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.core.config import PATHS, SIM_CONFIG
-from src.data.loader import DataLoader
-from src.data.processor import DataProcessor
-from src.core.graph import ContactGraphBuilder
+from src.core.config import SIM_CONFIG
 from src.core.sparse_network import SparseContactNetwork
-from src.core.epidemic import VectorizedSIRSimulator, VectorizedPropagationTree
-from src.core.network_cache import NetworkCacheManager
+from src.core.epidemic import VectorizedPropagationTree
 from src.analysis.analyzers import AnalysisCoordinator, create_infected_subgraph
 from src.utils.logger import get_logger
+from api.dependencies import get_dependencies  # Compartidas con el router MTC
+from api.simulation_store import create_simulation_store, pack_states, unpack_states
 
 logger = get_logger(__name__)
 
@@ -98,25 +98,26 @@ class SimulationSummary(BaseModel):
 # Almacenamiento en memoria de simulaciones
 # ============================================================================
 
-_simulations: Dict[str, Dict[str, Any]] = {}
-_loader = None
-_processor = None
-_graph_builder = None
-_network_cache = None
+# Memoria del proceso (LRU + TTL) o Redis si SIMULATION_REDIS_URL está definida
+_simulations = create_simulation_store()
+_rng = np.random.default_rng()  # PCG64 sembrado una vez desde la entropía del sistema
 
+# Un solo hilo: las simulaciones reutilizan los simuladores cacheados por día,
+# así que se ejecutan de a una, pero fuera del event loop
+_SIM_EXECUTOR = ThreadPoolExecutor(max_workers=1)
 
-def get_dependencies():
-    """Inicializa y retorna dependencias globales."""
-    global _loader, _processor, _graph_builder, _network_cache
-    
-    if _loader is None:
-        _loader = DataLoader(PATHS.estudiantes, PATHS.clases, PATHS.asistencias)
-        _processor = DataProcessor()
-        _graph_builder = ContactGraphBuilder()
-        _network_cache = NetworkCacheManager(_graph_builder)
-        logger.info("Dependencias de simulación inicializadas")
-    
-    return _loader, _processor, _graph_builder, _network_cache
+# Lecturas del store (con Redis son viajes de red síncronos): pool propio para
+# no bloquear el event loop ni esperar detrás de una simulación en curso
+_STORE_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+
+async def _get_simulation(simulation_id: str) -> Dict[str, Any]:
+    """Lee el registro de la simulación fuera del event loop (404 si no existe o expiró)."""
+    loop = asyncio.get_running_loop()
+    sim = await loop.run_in_executor(_STORE_EXECUTOR, _simulations.get, simulation_id)
+    if sim is None:
+        raise HTTPException(status_code=404, detail="Simulación no encontrada")
+    return sim
 
 
 # ============================================================================
@@ -132,9 +133,18 @@ async def start_simulation(request: SimulationRequest):
     - beta: Tasa de transmisión (0-1)
     - num_pacientes_cero: Cantidad de pacientes iniciales
     
+    La simulación (CPU-bound) se ejecuta en un hilo dedicado para no
+    bloquear el event loop.
+    
     Returns:
         SimulationResponse con ID de simulación y pacientes cero seleccionados
     """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_SIM_EXECUTOR, _run_simulation, request)
+
+
+def _run_simulation(request: SimulationRequest) -> SimulationResponse:
+    """Ejecuta la simulación completa de forma síncrona (ver start_simulation)."""
     try:
         # Generar ID único
         simulation_id = str(uuid.uuid4())
@@ -142,19 +152,19 @@ async def start_simulation(request: SimulationRequest):
         # Obtener dependencias
         loader, processor, graph_builder, network_cache = get_dependencies()
         
-        # Cargar datos
-        estudiantes, clases, asistencias = loader.load_all()
-        df_unificado = processor.create_unified_dataframe(estudiantes, clases, asistencias)
+        # Datos precargados (cacheados en el processor hasta que cambien los CSV)
+        estudiantes = processor.get_estudiantes(loader)
+        student_ids, id_to_gidx = processor.get_student_index(loader)
+        daily_dataframes = processor.get_daily_dataframes(loader)
+        version = loader.get_data_version()
         
-        # Seleccionar pacientes cero aleatorios
-        np.random.seed(int(time.time() * 1000000) % 2**32)
-        pacientes_cero = np.random.choice(
-            estudiantes['id_estudiante'].tolist(),
+        # Seleccionar pacientes cero aleatorios (índices globales, sin lista de IDs)
+        pacientes_cero_gidx = _rng.choice(
+            len(student_ids),
             size=request.num_pacientes_cero,
             replace=False
-        ).tolist()
-        # Asegurar que son strings
-        pacientes_cero = [str(pid) for pid in pacientes_cero]
+        )
+        pacientes_cero = student_ids[pacientes_cero_gidx].tolist()
         
         # Simulación iniciada
         
@@ -162,31 +172,37 @@ async def start_simulation(request: SimulationRequest):
         infected_by_day = []
         propagation_tree = VectorizedPropagationTree()
         
-        # Estados globales (asegurar que todas las claves son strings)
-        global_states = {str(sid): 0 for sid in estudiantes['id_estudiante']}
-        for pid in pacientes_cero:
-            global_states[str(pid)] = 1
+        # Estados globales: 0=S, 1=I, indexados por índice global de estudiante
+        global_states = np.zeros(len(student_ids), dtype=np.uint8)
+        global_states[pacientes_cero_gidx] = 1
+        
+        # Acumulados incrementales (solo cambian en los días con nuevos contagios)
+        total_infectados = len(pacientes_cero_gidx)
+        infectados_ids = student_ids[np.flatnonzero(global_states)].tolist()
+        
+        # Redes de todos los días construidas en paralelo (solo la primera vez)
+        network_cache.prebuild({dia: daily_dataframes[dia] for dia in SIM_CONFIG.dias_semana},
+                               version=version)
         
         dia_numero = 0
         for dia_nombre in SIM_CONFIG.dias_semana:
-            df_dia = processor.filter_by_day(df_unificado, dia_nombre)
+            df_dia = daily_dataframes[dia_nombre]
             
             if len(df_dia) == 0:
                 continue
             
             # Construir red sparse
-            sparse_network = network_cache.get_or_build(dia_nombre, df_dia)
+            sparse_network = network_cache.get_or_build(dia_nombre, df_dia, id_to_gidx,
+                                                        version=version)
             
             if sparse_network.get_node_count() == 0:
                 continue
             
-            # Simulador vectorizado
-            simulator = VectorizedSIRSimulator(request.beta, sparse_network.get_node_count())
-            simulator.set_contact_matrix(sparse_network.get_matrix())
+            # Simulador vectorizado (reutilizado por día; solo se resetean sus estados)
+            simulator = network_cache.get_simulator(dia_nombre, request.beta, sparse_network, rng=_rng)
             
-            # Mapear infectados
-            infectados_globales = [sid for sid, s in global_states.items() if s == 1]
-            patient_zero_indices = sparse_network.map_ids_to_indices(infectados_globales)
+            # Mapear infectados (índices globales → índices de la red del día)
+            patient_zero_indices = sparse_network.infected_local_indices(global_states)
             simulator.initialize_infections(patient_zero_indices)
             
             # Simular tick
@@ -194,9 +210,10 @@ async def start_simulation(request: SimulationRequest):
             
             # Actualizar estados
             if num_nuevos > 0:
-                new_ids = sparse_network.map_indices_to_ids(new_indices)
-                for nid in new_ids:
-                    global_states[str(nid)] = 1
+                new_global = sparse_network.map_indices_to_global(new_indices)
+                global_states[new_global] = 1
+                total_infectados += len(new_global)
+                infectados_ids = student_ids[np.flatnonzero(global_states)].tolist()
                 
                 # Registrar transmisiones
                 infected_indices = simulator.get_infected_indices()
@@ -208,9 +225,6 @@ async def start_simulation(request: SimulationRequest):
                     sparse_network.idx_to_node
                 )
             
-            total_infectados = sum(global_states.values())
-            infectados_ids = [str(sid) for sid, s in global_states.items() if s == 1]
-            
             infected_by_day.append(InfectedByDay(
                 dia=dia_nombre,
                 dia_numero=dia_numero,
@@ -224,20 +238,21 @@ async def start_simulation(request: SimulationRequest):
         # Calcular WCC
         arbol_nx = propagation_tree.to_networkx()
         analyzer = AnalysisCoordinator()
-        all_results = analyzer.run_all_analyses(arbol_nx, estudiantes)
+        all_results = analyzer.run_analyses(arbol_nx, estudiantes, names=('wcc',), verbose=False)  # Centralidad no se expone
         wcc_results = all_results.get('wcc', {})
         
-        # Almacenar resultados
-        _simulations[simulation_id] = {
+        # Almacenar resultados (estados comprimidos a bits, sin el DataFrame de estudiantes)
+        _simulations.save(simulation_id, {
             'beta': request.beta,
             'num_pacientes_cero': request.num_pacientes_cero,
             'pacientes_cero': pacientes_cero,
-            'infected_by_day': infected_by_day,
-            'global_states': global_states,
+            'infected_by_day': [day.model_dump() for day in infected_by_day],  # Mismo registro en memoria y en Redis (JSON)
+            'global_states': pack_states(global_states),
+            'num_estudiantes': len(estudiantes),
+            'infectados_finales': student_ids[np.flatnonzero(global_states)].tolist(),
             'wcc_results': wcc_results,
-            'estudiantes': estudiantes,
             'timestamp': time.time()
-        }
+        })
         
         # Simulación completada
         
@@ -262,12 +277,10 @@ async def get_infected(simulation_id: str):
     Returns:
         InfectedResponse con infectados por día
     """
-    if simulation_id not in _simulations:
-        raise HTTPException(status_code=404, detail="Simulación no encontrada")
+    sim = await _get_simulation(simulation_id)
     
-    sim = _simulations[simulation_id]
-    total_final = sum(sim['global_states'].values())
-    num_estudiantes = len(sim['estudiantes'])
+    total_final = int(unpack_states(sim['global_states'], sim['num_estudiantes']).sum())
+    num_estudiantes = sim['num_estudiantes']
     tasa_ataque = (total_final / num_estudiantes) * 100 if num_estudiantes > 0 else 0
     
     # Retornando infectados
@@ -290,10 +303,8 @@ async def get_wcc(simulation_id: str):
     Returns:
         WCCResponse con análisis de componentes
     """
-    if simulation_id not in _simulations:
-        raise HTTPException(status_code=404, detail="Simulación no encontrada")
+    sim = await _get_simulation(simulation_id)
     
-    sim = _simulations[simulation_id]
     wcc = sim['wcc_results']
     
     # Extraer componentes principales
@@ -332,15 +343,13 @@ async def get_simulation_summary(simulation_id: str):
     Returns:
         SimulationSummary con métricas completas
     """
-    if simulation_id not in _simulations:
-        raise HTTPException(status_code=404, detail="Simulación no encontrada")
+    sim = await _get_simulation(simulation_id)
     
-    sim = _simulations[simulation_id]
     
     # Calcular métricas
     total_dias = len(sim['infected_by_day'])
-    total_infectados = sum(sim['global_states'].values())
-    num_estudiantes = len(sim['estudiantes'])
+    total_infectados = int(unpack_states(sim['global_states'], sim['num_estudiantes']).sum())
+    num_estudiantes = sim['num_estudiantes']
     tasa_ataque = (total_infectados / num_estudiantes) * 100 if num_estudiantes > 0 else 0
     
     # Determinar severidad
@@ -352,14 +361,14 @@ async def get_simulation_summary(simulation_id: str):
         severidad = "alta"
     
     # Infectados finales (todos con estado 1)
-    infectados_finales = [str(sid) for sid, state in sim['global_states'].items() if state == 1]
+    infectados_finales = sim['infectados_finales']
     
     # Curva de crecimiento
     curva = [
         {
-            'dia': day.dia_numero,
-            'total': day.total_infectados,
-            'nuevos': day.nuevos_infectados
+            'dia': day['dia_numero'],
+            'total': day['total_infectados'],
+            'nuevos': day['nuevos_infectados']
         }
         for day in sim['infected_by_day']
     ]
@@ -0,0 +1,135 @@
+"""
+Almacenamiento de resultados de simulación.
+
+Backend en memoria (LRU con TTL) para desarrollo y Redis opcional para
+compartir simulaciones entre workers de uvicorn.
+"""
+import base64
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from src.core.config import STORE_CONFIG, StoreConfig
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def pack_states(states: np.ndarray) -> bytes:
+    """Comprime estados 0/1 (uint8) a N/8 bytes."""
+    return np.packbits(states).tobytes()
+
+
+def unpack_states(blob: bytes, num_estudiantes: int) -> np.ndarray:
+    """Inversa de pack_states."""
+    return np.unpackbits(np.frombuffer(blob, dtype=np.uint8), count=num_estudiantes)
+
+
+def _json_default(value: Any) -> Any:
+    """Tipos del registro que json no serializa (bytes de estados, modelos, NumPy, sets)."""
+    if isinstance(value, bytes):
+        return {'__b64__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (np.ndarray, set, frozenset)):
+        return list(value.tolist() if isinstance(value, np.ndarray) else value)
+    raise TypeError(f"Tipo no serializable en el registro: {type(value).__name__}")
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    """Inversa de _json_default para los bytes codificados en base64."""
+    if len(obj) == 1 and '__b64__' in obj:
+        return base64.b64decode(obj['__b64__'])
+    return obj
+
+
+def dump_record(record: Dict[str, Any]) -> bytes:
+    """Serializa un registro a JSON (sin pickle: leerlo no puede ejecutar código)."""
+    return json.dumps(record, default=_json_default, separators=(',', ':')).encode()
+
+
+def load_record(blob: bytes) -> Dict[str, Any]:
+    """Inversa de dump_record (los modelos vuelven como dicts)."""
+    return json.loads(blob, object_hook=_json_object_hook)
+
+
+class SimulationStore(ABC):
+    """Interfaz de almacenamiento de simulaciones (registro = dict serializable)."""
+
+    @abstractmethod
+    def save(self, simulation_id: str, record: Dict[str, Any]):
+        pass
+
+    @abstractmethod
+    def get(self, simulation_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+
+class InMemorySimulationStore(SimulationStore):
+    """Diccionario del proceso acotado en tamaño (LRU) y con expiración.
+
+    Se escribe desde el executor de simulaciones y se lee desde el event loop,
+    por lo que los accesos al OrderedDict se serializan con un lock.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, simulation_id: str, record: Dict[str, Any]):
+        with self._lock:
+            self._records[simulation_id] = record
+            self._records.move_to_end(simulation_id)
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+
+    def get(self, simulation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(simulation_id)
+            if record is None:
+                return None
+
+            if time.time() - record['timestamp'] > self.ttl_seconds:
+                self._records.pop(simulation_id, None)
+                return None
+
+            self._records.move_to_end(simulation_id)
+            return record
+
+
+class RedisSimulationStore(SimulationStore):
+    """Registros JSON bajo sim:{id} con TTL (visibles para todos los workers)."""
+
+    KEY_PREFIX = "sim:"
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis  # Dependencia opcional: solo requerida con SIMULATION_REDIS_URL
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    def save(self, simulation_id: str, record: Dict[str, Any]):
+        self._client.set(self.KEY_PREFIX + simulation_id, dump_record(record),
+                         ex=self.ttl_seconds)
+
+    def get(self, simulation_id: str) -> Optional[Dict[str, Any]]:
+        blob = self._client.get(self.KEY_PREFIX + simulation_id)
+        return load_record(blob) if blob is not None else None
+
+
+def create_simulation_store(config: StoreConfig = STORE_CONFIG) -> SimulationStore:
+    """Redis si hay URL configurada; si no, memoria del proceso."""
+    if config.redis_url:
+        logger.info("Almacenamiento de simulaciones: Redis")
+        return RedisSimulationStore(config.redis_url, config.ttl_seconds)
+    return InMemorySimulationStore(config.max_entries, config.ttl_seconds)
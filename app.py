@@ -4,22 +4,43 @@ FastAPI Application Entry Point - Simulador de Epidemias Web API
 Este módulo define la aplicación principal FastAPI que expone
 la lógica de simulación epidémica a través de una API REST local.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.utils.logger import get_logger
 
 # Routers
 from api.routers import nodes, simulation, mtc
+from api.dependencies import preload_data
 
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ciclo de vida - inicializar recursos al inicio y limpiarlos al cierre."""
+    logger.info("Iniciando Simulador de Epidemias API v1.0.0")
+    
+    # Precargar datos estáticos (CSV → DataFrames y redes por día, compartidos por
+    # simulación y MTC); si falla, se cargan en la primera petición
+    try:
+        preload_data()
+    except Exception as e:
+        logger.warning(f"No se pudieron precargar los datos: {e}")
+    
+    logger.info("Documentación disponible en: http://localhost:8000/docs")
+    yield
+    logger.info("Cerrando Simulador de Epidemias API")
+
+
 # Crear instancia FastAPI
 app = FastAPI(
     title="Simulador de Epidemias API",
     description="API REST para simulación de epidemias en redes de contacto estudiantil",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configurar CORS para desarrollo local
@@ -48,19 +69,6 @@ async def root():
     }
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Evento de inicio - inicializar recursos."""
-    logger.info("Iniciando Simulador de Epidemias API v1.0.0")
-    logger.info("Documentación disponible en: http://localhost:8000/docs")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Evento de cierre - limpieza de recursos."""
-    logger.info("Cerrando Simulador de Epidemias API")
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
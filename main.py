@@ -38,18 +38,16 @@ class GraphSimulatorApp:
         """Ejecuta la simulación."""
         DirectoryManager.clean_and_create(self.paths.OUTPUT_DIR)
         
-        estudiantes, clases, asistencias = self.loader.load_all()
-        df_unificado = self.processor.create_unified_dataframe(
-            estudiantes, clases, asistencias
-        )
+        daily_dataframes = self.processor.get_daily_dataframes(self.loader)
         
         print(f"\n{'Día':<12} {'Nodos':>6} {'Aristas':>8} {'Densidad':>10} {'MST Edges':>10}")
         print("=" * 60)
         
         output_dir = self.paths.grafos_diarios
+        daily_graphs, msts = {}, {}
         
         for dia_nombre in self.sim_config.dias_semana:
-            df_dia = self.processor.filter_by_day(df_unificado, dia_nombre)
+            df_dia = daily_dataframes[dia_nombre]
             
             if len(df_dia) == 0:
                 continue
@@ -63,12 +61,14 @@ class GraphSimulatorApp:
             print(f"{dia_nombre:<12} {stats['nodos']:>6} {stats['aristas']:>8} "
                   f"{stats['densidad']:>10.4f} {mst_graph.number_of_edges():>10}")
             
-            self.visualizer.visualize_daily_graph(G_dia, dia_nombre, output_dir)
-            self.visualizer.visualize_weighted_graph(G_dia, dia_nombre, output_dir)
-            
-            self.visualizer.visualize_mst(mst_graph, dia_nombre, output_dir)
+            daily_graphs[dia_nombre] = G_dia
+            msts[dia_nombre] = mst_graph
         
         print("=" * 60)
+        
+        # Los días son independientes: un proceso de matplotlib por día
+        self.visualizer.visualize_all_days_parallel(daily_graphs, output_dir, msts)
+        
         print(f"Resultados: {output_dir}")
         print(f"  - Grafos completos: *_pesos.png")
         print(f"  - MST: *_mst.png\n")
@@ -15,7 +15,7 @@ from src.data.loader import DataLoader
 from src.data.processor import DataProcessor
 from src.core.graph import ContactGraphBuilder
 from src.core.sparse_network import SparseContactNetwork
-from src.core.epidemic import VectorizedSIRSimulator, VectorizedPropagationTree
+from src.core.epidemic import VectorizedPropagationTree
 from src.core.network_cache import NetworkCacheManager
 from src.visualization.visualizers import VisualizationFacade
 from src.analysis.analyzers import AnalysisCoordinator, create_infected_subgraph
@@ -34,7 +34,7 @@ class EpidemicSimulatorApp:
     - 100% compatible con análisis WCC
     """
     
-    def __init__(self, beta: float = None):
+    def __init__(self, beta: float = None, generate_plots: bool = True):
         self.paths = PATHS
         self.sim_config = SIM_CONFIG
         self.viz_config = VIZ_CONFIG
@@ -42,6 +42,9 @@ class EpidemicSimulatorApp:
         # Permitir anulación de beta
         self.beta = beta if beta is not None else self.sim_config.beta
         
+        # Las visualizaciones (matplotlib) dominan el tiempo total; se pueden omitir
+        self.generate_plots = generate_plots
+        
         # Inicializar componentes
         self.loader = DataLoader(
             self.paths.estudiantes,
@@ -50,9 +53,11 @@ class EpidemicSimulatorApp:
         )
         self.processor = DataProcessor()
         self.graph_builder = ContactGraphBuilder()
-        self.network_cache = NetworkCacheManager(self.graph_builder)  # Cache optimizado
+        self.network_cache = NetworkCacheManager(self.graph_builder,  # Cache optimizado
+                                                 persist_dir=self.paths.CACHE_DIR)
         self.visualizer = VisualizationFacade(self.viz_config)
         self.analyzer = AnalysisCoordinator()
+        self.rng = np.random.default_rng()  # Sembrado desde la entropía del sistema
         
         # Métricas de rendimiento
         self.timing = {
@@ -68,27 +73,27 @@ class EpidemicSimulatorApp:
         print("SIMULADOR EPIDÉMICO v2.0 (Optimizado con CSR)")
         print("="*70)
         
-        # Configuración
-        DirectoryManager.clean_and_create(self.paths.OUTPUT_DIR)
+        # Configuración (sin gráficos no se toca el directorio de salida)
+        if self.generate_plots:
+            DirectoryManager.clean_and_create(self.paths.OUTPUT_DIR)
         
         # Cargar datos
         print("\nCargando datos...")
-        estudiantes, clases, asistencias = self.loader.load_all()
-        df_unificado = self.processor.create_unified_dataframe(
-            estudiantes, clases, asistencias
-        )
+        estudiantes = self.processor.get_estudiantes(self.loader)
+        student_ids, id_to_gidx = self.processor.get_student_index(self.loader)
+        daily_dataframes = self.processor.get_daily_dataframes(self.loader)
+        version = self.loader.get_data_version()
         
         num_estudiantes = len(estudiantes)
         print(f"  Estudiantes: {num_estudiantes}")
         
         # Seleccionar pacientes cero aleatorios
-        # Usar semilla basada en tiempo para aleatoriedad siempre
-        np.random.seed(int(time.time() * 1000000) % 2**32)
-        pacientes_cero = np.random.choice(
-            estudiantes['id_estudiante'].tolist(),
+        pacientes_cero_gidx = self.rng.choice(
+            len(student_ids),
             size=self.sim_config.num_pacientes_cero,
             replace=False
-        ).tolist()
+        )
+        pacientes_cero = student_ids[pacientes_cero_gidx].tolist()
         
         print(f"\nPacientes cero: {pacientes_cero}")
         print(f"Beta (tasa de transmisión): {self.beta}")
@@ -97,13 +102,13 @@ class EpidemicSimulatorApp:
         print(f"{'='*70}")
         
         # Crear simulador vectorizado global
-        # Nota: Crearemos un nuevo simulador por día porque el tamaño de la red cambia
+        # Nota: hay un simulador por día (el tamaño de la red cambia), cacheado en network_cache
         propagation_tree = VectorizedPropagationTree()
         
-        # Estados globales (para todos los estudiantes)
-        global_states = {sid: 0 for sid in estudiantes['id_estudiante']}
-        for pid in pacientes_cero:
-            global_states[pid] = 1
+        # Estados globales (para todos los estudiantes, por índice global)
+        global_states = np.zeros(len(student_ids), dtype=np.uint8)
+        global_states[pacientes_cero_gidx] = 1
+        total_infectados = len(pacientes_cero_gidx)  # Contador incremental
         
         # Encabezado
         print(f"\n{'Día':<12} {'Nuevos':>6} {'Total':>6} {'Nodos':>6} {'Tiempo':>10}")
@@ -112,9 +117,15 @@ class EpidemicSimulatorApp:
         output_dir = self.paths.epidemia
         total_sim_time = 0
         
+        # Redes de todos los días construidas en paralelo antes del bucle
+        t_start = time.perf_counter()
+        self.network_cache.prebuild({dia: daily_dataframes[dia] for dia in self.sim_config.dias_semana},
+                                    version=version)
+        self.timing['construccion_redes'] += time.perf_counter() - t_start
+        
         # Simular cada día
         for dia_nombre in self.sim_config.dias_semana:
-            df_dia = self.processor.filter_by_day(df_unificado, dia_nombre)
+            df_dia = daily_dataframes[dia_nombre]
             
             if len(df_dia) == 0:
                 continue
@@ -123,7 +134,8 @@ class EpidemicSimulatorApp:
             # CONSTRUCCIÓN DE RED SPARSE CON CACHE (Optimizado)
             # ================================================================
             t_start = time.perf_counter()
-            sparse_network = self.network_cache.get_or_build(dia_nombre, df_dia)
+            sparse_network = self.network_cache.get_or_build(dia_nombre, df_dia, id_to_gidx,
+                                                             version=version)
             t_construccion = time.perf_counter() - t_start
             self.timing['construccion_redes'] += t_construccion
             
@@ -135,13 +147,12 @@ class EpidemicSimulatorApp:
             # ================================================================
             t_start = time.perf_counter()
             
-            # Crear simulador para este día
-            simulator = VectorizedSIRSimulator(self.beta, sparse_network.get_node_count())
-            simulator.set_contact_matrix(sparse_network.get_matrix())
+            # Simulador del día (reutilizado desde el cache)
+            simulator = self.network_cache.get_simulator(dia_nombre, self.beta, sparse_network,
+                                                         rng=self.rng)
             
             # Mapear pacientes cero a índices
-            infectados_globales = [sid for sid, s in global_states.items() if s == 1]
-            patient_zero_indices = sparse_network.map_ids_to_indices(infectados_globales)
+            patient_zero_indices = sparse_network.infected_local_indices(global_states)
             simulator.initialize_infections(patient_zero_indices)
             
             # Simular un tick (un día)
@@ -149,9 +160,9 @@ class EpidemicSimulatorApp:
             
             # Actualizar estados globales
             if num_nuevos > 0:
-                new_ids = sparse_network.map_indices_to_ids(new_indices)
-                for nid in new_ids:
-                    global_states[nid] = 1
+                new_global = sparse_network.map_indices_to_global(new_indices)
+                global_states[new_global] = 1
+                total_infectados += len(new_global)
                 
                 # Registrar transmisiones
                 infected_indices = simulator.get_infected_indices()
@@ -167,8 +178,6 @@ class EpidemicSimulatorApp:
             total_sim_time += t_simulacion
             self.timing['simulacion'] += t_simulacion
             
-            total_infectados = sum(global_states.values())
-            
             # Imprimir estadísticas
             print(f"{dia_nombre:<12} {num_nuevos:>6} {total_infectados:>6} "
                   f"{sparse_network.get_node_count():>6} {t_simulacion*1000:>9.2f}ms")
@@ -176,33 +185,11 @@ class EpidemicSimulatorApp:
             # ================================================================
             # VISUALIZACIÓN (Convertir a NetworkX para visualizar)
             # ================================================================
-            t_start = time.perf_counter()
-            
-            # Construir NetworkX solo para visualización
-            G_dia = self.graph_builder.build_daily_graph(df_dia)
-            
-            # Convertir estados a formato esperado
-            estados_dia = simulator.get_states_dict(sparse_network.idx_to_node)
-            nuevos_set = set(sparse_network.map_indices_to_ids(new_indices)) if num_nuevos > 0 else set()
-            
-            # Visualizar estado epidémico
-            self.visualizer.visualize_epidemic_state(
-                G_dia,
-                estados_dia,
-                nuevos_set,
-                dia_nombre,
-                output_dir
-            )
-            
-            # Visualizar subgrafo de infectados
-            G_infectados = create_infected_subgraph(G_dia, estados_dia)
-            self.visualizer.visualize_infected_subgraph(
-                G_infectados,
-                dia_nombre,
-                output_dir
-            )
-            
-            self.timing['visualizacion'] += time.perf_counter() - t_start
+            if self.generate_plots:
+                t_start = time.perf_counter()
+                self._visualize_day(dia_nombre, df_dia, simulator, sparse_network,
+                                    new_indices, num_nuevos, output_dir)
+                self.timing['visualizacion'] += time.perf_counter() - t_start
         
         # ====================================================================
         # RESUMEN FINAL Y ANÁLISIS WCC
@@ -216,10 +203,38 @@ class EpidemicSimulatorApp:
             total_sim_time
         )
     
+    def _visualize_day(self, dia_nombre, df_dia, simulator, sparse_network,
+                       new_indices, num_nuevos, output_dir):
+        """Genera las visualizaciones del estado epidémico de un día."""
+        # NetworkX solo para visualización (cacheado por día)
+        G_dia = self.network_cache.get_daily_graph(dia_nombre, df_dia,
+                                                   version=self.loader.get_data_version())
+        
+        # Convertir estados a formato esperado
+        estados_dia = simulator.get_states_dict(sparse_network.idx_to_node)
+        nuevos_set = set(sparse_network.map_indices_to_ids(new_indices)) if num_nuevos > 0 else set()
+        
+        # Visualizar estado epidémico
+        self.visualizer.visualize_epidemic_state(
+            G_dia,
+            estados_dia,
+            nuevos_set,
+            dia_nombre,
+            output_dir
+        )
+        
+        # Visualizar subgrafo de infectados
+        G_infectados = create_infected_subgraph(G_dia, estados_dia)
+        self.visualizer.visualize_infected_subgraph(
+            G_infectados,
+            dia_nombre,
+            output_dir
+        )
+    
     def _print_summary(self, global_states, propagation_tree, total_pop, 
                       estudiantes, output_dir, sim_time):
         """Imprime resumen final de simulación."""
-        total_infectados = sum(global_states.values())
+        total_infectados = int(global_states.sum())
         tasa_ataque = (total_infectados / total_pop) * 100
         
         print("=" * 70)
@@ -235,11 +250,12 @@ class EpidemicSimulatorApp:
         print(f"  Conversión completada en {conversion_time*1000:.2f}ms")
         
         # Visualizar árbol de propagación
-        t_start = time.perf_counter()
-        arbol_path = output_dir / 'arbol_propagacion.png'
-        self.visualizer.visualize_propagation_tree(arbol_nx, arbol_path)
-        print(f"  Árbol: {arbol_path}")
-        self.timing['visualizacion'] += time.perf_counter() - t_start
+        if self.generate_plots:
+            t_start = time.perf_counter()
+            arbol_path = output_dir / 'arbol_propagacion.png'
+            self.visualizer.visualize_propagation_tree(arbol_nx, arbol_path)
+            print(f"  Árbol: {arbol_path}")
+            self.timing['visualizacion'] += time.perf_counter() - t_start
         
         # ====================================================================
         # ANÁLISIS WCC (100% COMPATIBLE)
@@ -276,16 +292,20 @@ class EpidemicSimulatorApp:
         print(f"TOTAL:                 {total_time*1000:.2f}ms")
         
         print(f"\n{'='*70}")
-        print(f"Resultados guardados en: {output_dir}")
+        if self.generate_plots:
+            print(f"Resultados guardados en: {output_dir}")
+        else:
+            print("Visualizaciones omitidas (--no-plots)")
         print(f"{'='*70}\n")
 
 
 def main():
     """Punto de entrada."""
-    # Permitir beta como argumento de línea de comandos
-    beta = float(sys.argv[1]) if len(sys.argv) > 1 else None
+    # Permitir beta como argumento de línea de comandos (--no-plots omite gráficos)
+    args = [arg for arg in sys.argv[1:] if arg != '--no-plots']
+    beta = float(args[0]) if args else None
     
-    app = EpidemicSimulatorApp(beta)
+    app = EpidemicSimulatorApp(beta, generate_plots='--no-plots' not in sys.argv[1:])
     app.run()
 
 
@@ -22,6 +22,10 @@ from .analyzers import (
     create_infected_subgraph
 )
 
+# Kernels compilados
+from .betweenness_numba import tree_betweenness_centrality, tree_centrality_arrays
+from .kruskal_numba import kruskal_forest
+
 __all__ = [
     # Base
     'GraphAnalyzer',
@@ -37,6 +41,9 @@ __all__ = [
     'DailyGraphAnalysisCoordinator',
     
     # Helpers
-    'create_infected_subgraph'
+    'create_infected_subgraph',
+    'tree_betweenness_centrality',
+    'tree_centrality_arrays',
+    'kruskal_forest'
 ]
 
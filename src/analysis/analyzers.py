@@ -1,7 +1,7 @@
 """Módulo coordinador de análisis - Patrón Fachada."""
 import networkx as nx
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional
 
 from .wcc_analyzer import WCCAnalyzer
 from .mst_analyzer import MSTAnalyzer, MSTComparator
@@ -15,13 +15,32 @@ class AnalysisCoordinator:
         self.analyzers = {'wcc': WCCAnalyzer(), 'centrality': CentralityAnalyzer()}
     
     def run_all_analyses(self, propagation_tree: nx.DiGraph,
-                        estudiantes: pd.DataFrame = None) -> Dict[str, Dict]:
+                        estudiantes: pd.DataFrame = None,
+                        verbose: bool = True) -> Dict[str, Dict]:
         """Ejecuta todos los análisis de propagación y devuelve resultados."""
+        return self.run_analyses(propagation_tree, estudiantes, verbose=verbose)
+    
+    def run_analyses(self, propagation_tree: nx.DiGraph,
+                     estudiantes: pd.DataFrame = None,
+                     names: Optional[Iterable[str]] = None,
+                     verbose: bool = True) -> Dict[str, Dict]:
+        """
+        Ejecuta solo los análisis indicados (todos si names es None).
+        
+        Args:
+            propagation_tree: Árbol de propagación
+            estudiantes: DataFrame de estudiantes (opcional)
+            names: Claves de self.analyzers a ejecutar, e.g. ('wcc',)
+            verbose: Imprimir resultados por consola (solo CLI)
+        """
+        selected = self.analyzers.keys() if names is None else names
         results = {}
         
-        for name, analyzer in self.analyzers.items():
+        for name in selected:
+            analyzer = self.analyzers[name]
             results[name] = analyzer.analyze(propagation_tree, estudiantes=estudiantes)
-            analyzer.print_results(results[name])
+            if verbose:
+                analyzer.print_results(results[name])
         
         return results
     
@@ -50,13 +69,14 @@ class DailyGraphAnalysisCoordinator:
     def __init__(self, weight_mode: str = 'inverse'):
         self.analyzers = {'mst': MSTAnalyzer(weight_mode=weight_mode)}
     
-    def run_all_analyses(self, daily_graph: nx.Graph) -> Dict[str, Dict]:
-        """Ejecuta análisis MST y devuelve resultados."""
+    def run_all_analyses(self, daily_graph: nx.Graph, verbose: bool = True) -> Dict[str, Dict]:
+        """Ejecuta análisis MST y devuelve resultados (verbose=False no imprime)."""
         results = {}
         
         for name, analyzer in self.analyzers.items():
             results[name] = analyzer.analyze(daily_graph)
-            analyzer.print_results(results[name])
+            if verbose:
+                analyzer.print_results(results[name])
         
         return results
     
@@ -74,6 +94,16 @@ class DailyGraphAnalysisCoordinator:
 # Funciones helper (mantener retrocompatibilidad)
 
 def create_infected_subgraph(G: nx.Graph, estados: Dict[int, int]) -> nx.Graph:
-    """Crea subgrafo con solo nodos infectados."""
-    infectados = [n for n, s in estados.items() if s == 1 and n in G]
-    return G.subgraph(infectados).copy()
+    """
+    Crea subgrafo con solo nodos infectados.
+    
+    Construye el grafo directamente (aristas vía G.edges(nbunch)) en lugar de
+    G.subgraph(...).copy(), que filtra la adyacencia completa a través de vistas.
+    Conserva el orden de nodos de G y los atributos de nodos y aristas.
+    """
+    infectados = {n for n, s in estados.items() if s == 1}
+    
+    H = G.__class__()
+    H.add_nodes_from((n, G.nodes[n]) for n in G if n in infectados)
+    H.add_edges_from((u, v, d) for u, v, d in G.edges(H, data=True) if v in infectados)
+    return H
@@ -0,0 +1,103 @@
+"""Betweenness centrality exacta para árboles/bosques (MST) compilada con Numba."""
+import networkx as nx
+import numpy as np
+from numba import njit
+from typing import Dict, Hashable, List, Tuple
+
+
+@njit(cache=True)
+def tree_betweenness(indptr: np.ndarray, indices: np.ndarray, n: int) -> np.ndarray:
+    """
+    Brandes simplificado para bosques: cada par de nodos tiene un único camino.
+
+    Por cada fuente se recorre su árbol con DFS iterativo y, en el recorrido de
+    retorno, se acumula delta[padre] += 1 + delta[hijo].
+
+    Args:
+        indptr, indices: Adyacencia CSR no dirigida (int32)
+        n: Número de nodos
+
+    Returns:
+        Array float64 con betweenness normalizada igual que NetworkX
+    """
+    betweenness = np.zeros(n, dtype=np.float64)
+    order = np.empty(n, dtype=np.int32)
+    stack = np.empty(n, dtype=np.int32)
+    parent = np.full(n, -1, dtype=np.int32)
+    delta = np.zeros(n, dtype=np.float64)
+
+    for s in range(n):
+        # DFS iterativo desde s (orden de descubrimiento)
+        count = 0
+        top = 0
+        stack[top] = s
+        top += 1
+        parent[s] = s
+        while top > 0:
+            top -= 1
+            v = stack[top]
+            order[count] = v
+            count += 1
+            for k in range(indptr[v], indptr[v + 1]):
+                w = indices[k]
+                if parent[w] == -1:
+                    parent[w] = v
+                    stack[top] = w
+                    top += 1
+
+        # Retorno: acumular dependencias de hojas hacia la raíz
+        for i in range(count - 1, 0, -1):
+            w = order[i]
+            delta[parent[w]] += 1.0 + delta[w]
+            betweenness[w] += delta[w]
+
+        # Resetear solo los nodos visitados
+        for i in range(count):
+            w = order[i]
+            parent[w] = -1
+            delta[w] = 0.0
+
+    # Pares ordenados (s, t) → misma escala que nx.betweenness_centrality(normalized=True)
+    if n > 2:
+        betweenness /= (n - 1) * (n - 2)
+
+    return betweenness
+
+
+def graph_to_csr(graph: nx.Graph) -> Tuple[List[Hashable], np.ndarray, np.ndarray]:
+    """Convierte un grafo NetworkX no dirigido a arrays CSR (nodos, indptr, indices)."""
+    nodes = list(graph.nodes())
+    node2idx = {node: i for i, node in enumerate(nodes)}
+
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int32)
+    indices = np.empty(2 * graph.number_of_edges(), dtype=np.int32)
+
+    pos = 0
+    for i, node in enumerate(nodes):
+        for neighbor in graph.adj[node]:
+            indices[pos] = node2idx[neighbor]
+            pos += 1
+        indptr[i + 1] = pos
+
+    return nodes, indptr, indices
+
+
+def tree_betweenness_centrality(graph: nx.Graph) -> Dict[Hashable, float]:
+    """Equivalente a nx.betweenness_centrality(graph) para bosques (p. ej. un MST)."""
+    nodes, indptr, indices = graph_to_csr(graph)
+    betweenness = tree_betweenness(indptr, indices, len(nodes))
+    return dict(zip(nodes, betweenness.tolist()))
+
+
+def tree_centrality_arrays(graph: nx.Graph) -> Tuple[List[Hashable], np.ndarray, np.ndarray]:
+    """
+    Betweenness y grado de un bosque como arrays alineados con graph.nodes().
+
+    Returns:
+        (nodes, betweenness float64, grado int64) — el grado sale de indptr sin
+        recorrer el grafo otra vez
+    """
+    nodes, indptr, indices = graph_to_csr(graph)
+    betweenness = tree_betweenness(indptr, indices, len(nodes))
+    degrees = np.diff(indptr).astype(np.int64)
+    return nodes, betweenness, degrees
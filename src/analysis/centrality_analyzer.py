@@ -1,7 +1,9 @@
 """Analizador de centralidad para identificar nodos clave."""
 import networkx as nx
+import numpy as np
 from typing import Dict, Any
 from .base import GraphAnalyzer
+from ..utils.helpers import top_k_indices
 
 
 class CentralityAnalyzer(GraphAnalyzer):
@@ -9,11 +11,14 @@ class CentralityAnalyzer(GraphAnalyzer):
     
     def analyze(self, graph: nx.DiGraph, **kwargs) -> Dict[str, Any]:
         """Analiza métricas de centralidad."""
-        if graph.number_of_edges() == 0:
+        # Grado de salida como array (sin dict intermedio); su suma es el número de aristas
+        nodes = list(graph)
+        out_degrees = np.fromiter((d for _, d in graph.out_degree()), dtype=np.int64, count=len(nodes))
+        if out_degrees.sum() == 0:
             return {'top_spreaders': [], 'max_spread': 0}
         
-        out_degrees = dict(graph.out_degree())
-        top_spreaders = sorted(out_degrees.items(), key=lambda x: x[1], reverse=True)[:10]
+        # Top-10 en O(N) (empates en orden de nodos, igual que heapq.nlargest)
+        top_spreaders = [(nodes[i], int(out_degrees[i])) for i in top_k_indices(out_degrees, 10)]
         
         return {'top_spreaders': top_spreaders, 'max_spread': top_spreaders[0][1] if top_spreaders else 0}
     
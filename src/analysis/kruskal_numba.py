@@ -0,0 +1,53 @@
+"""Kruskal (bosque de expansión mínima) sobre arrays de aristas compilado con Numba."""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _find(parent: np.ndarray, x: int) -> int:
+    """Raíz de x con compresión de camino por mitades."""
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+@njit(cache=True)
+def kruskal_forest(u: np.ndarray, v: np.ndarray, order: np.ndarray, n: int) -> np.ndarray:
+    """
+    Selecciona las aristas del bosque de expansión mínima con union-find.
+
+    Las aristas se recorren en el orden dado; con un orden estable por peso los
+    empates se resuelven igual que nx.minimum_spanning_tree(algorithm='kruskal').
+
+    Args:
+        u, v: Extremos de cada arista como índices [0, n) (int32)
+        order: Posiciones de las aristas ordenadas por peso ascendente
+        n: Número de nodos
+
+    Returns:
+        Posiciones de las aristas seleccionadas, en orden de selección
+    """
+    parent = np.arange(n)
+    size = np.ones(n, dtype=np.int64)
+    selected = np.empty(max(n - 1, 0), dtype=np.int64)
+
+    count = 0
+    for k in order:
+        if count == n - 1:
+            break
+        ru = _find(parent, u[k])
+        rv = _find(parent, v[k])
+        if ru == rv:
+            continue
+
+        # Unión por tamaño
+        if size[ru] < size[rv]:
+            ru, rv = rv, ru
+        parent[rv] = ru
+        size[ru] += size[rv]
+
+        selected[count] = k
+        count += 1
+
+    return selected[:count]
@@ -3,11 +3,16 @@ import networkx as nx
 import numpy as np
 from typing import Dict, Any, List, Tuple
 from .base import GraphAnalyzer
+from .betweenness_numba import tree_centrality_arrays
+from .kruskal_numba import kruskal_forest
 
 
 class MSTAnalyzer(GraphAnalyzer):
     """Analiza MST para extraer estructura esencial de conexiones minimizando peso total."""
     
+    # Modos de pesos aceptados ('original' y 'direct' usan los pesos de contacto sin transformar)
+    WEIGHT_MODES = ('inverse', 'negative', 'original', 'direct')
+    
     def __init__(self, weight_mode: str = 'inverse'):
         """Inicializa con modo de transformación de pesos: 'inverse', 'negative' o 'original'."""
         self.weight_mode = weight_mode
@@ -16,40 +21,45 @@ class MSTAnalyzer(GraphAnalyzer):
         """Construye y analiza el MST del grafo."""
         if graph.number_of_nodes() == 0:
             return {'mst': nx.Graph(), 'num_componentes': 0, 'total_weight': 0.0,
-                    'avg_weight': 0.0, 'critical_edges': [], 'reduction_ratio': 0.0}
-        
-        G_weighted = self._prepare_graph(graph)
-        
-        # Construir MST usando Kruskal
-        if nx.is_connected(G_weighted):
-            mst = nx.minimum_spanning_tree(G_weighted, weight='mst_weight', algorithm='kruskal')
-            num_componentes = 1
-        else:
-            mst = nx.Graph()
-            components = list(nx.connected_components(G_weighted))
-            num_componentes = len(components)
-            
-            for component in components:
-                subgraph = G_weighted.subgraph(component)
-                if subgraph.number_of_nodes() > 1:
-                    sub_mst = nx.minimum_spanning_tree(subgraph, weight='mst_weight', algorithm='kruskal')
-                    mst.add_edges_from(sub_mst.edges(data=True))
-                else:
-                    mst.add_node(list(component)[0])
-        
-        # Restaurar pesos originales
-        for u, v in mst.edges():
-            mst[u][v]['peso'] = graph[u][v]['peso']
-            if 'mst_weight' in mst[u][v]:
-                del mst[u][v]['mst_weight']
+                    'avg_weight': 0.0, 'critical_edges': [],
+                    'critical_edges_arr': self._edge_arrays(nx.Graph()),
+                    'centrality_arr': ([], np.zeros(0), np.zeros(0, dtype=np.int64)),
+                    'reduction_ratio': 0.0}
+        
+        # Aristas como arrays de índices (orden de graph.edges(), igual que NetworkX)
+        index = {node: i for i, node in enumerate(graph.nodes())}
+        edges = list(graph.edges(data='peso', default=1.0))
+        u_idx = np.fromiter((index[e[0]] for e in edges), dtype=np.int32, count=len(edges))
+        v_idx = np.fromiter((index[e[1]] for e in edges), dtype=np.int32, count=len(edges))
+        pesos = np.fromiter((e[2] for e in edges), dtype=np.float64, count=len(edges))
+        
+        # Kruskal compilado: orden estable por peso → mismos desempates que nx (bosque si es disconexo)
+        order = np.argsort(self._transform_weights(pesos), kind='stable')
+        selected = kruskal_forest(u_idx, v_idx, order, len(index))
+        
+        mst = nx.Graph()
+        mst.add_nodes_from(graph.nodes(data=True))
+        mst.add_edges_from((edges[k][0], edges[k][1], {'peso': edges[k][2]}) for k in selected.tolist())
+        
+        # Un bosque con N nodos y E aristas tiene N - E componentes
+        num_componentes = len(index) - len(selected)
+        
+        # Betweenness exacta y grado como arrays (una sola vez; los reutilizan clasificación y API)
+        centrality_arr = tree_centrality_arrays(mst)
+        edge_arrays = self._edge_arrays(mst)
+        
+        # Total y promedio desde el array de pesos (una sola pasada por las aristas)
+        total_weight, avg_weight = self._weight_stats(edge_arrays[2])
         
         return {
             'mst': mst,
             'num_componentes': num_componentes,
-            'total_weight': self._calculate_total_weight(mst),
-            'avg_weight': self._calculate_avg_weight(mst),
-            'critical_edges': self._find_critical_edges(mst),
-            'critical_nodes': self._classify_critical_nodes(mst),  # NEW
+            'total_weight': total_weight,
+            'avg_weight': avg_weight,
+            'critical_edges': self._find_critical_edges(edge_arrays),
+            'critical_edges_arr': edge_arrays,
+            'critical_nodes': self._classify_critical_nodes(*centrality_arr),  # NEW
+            'centrality_arr': centrality_arr,
             'reduction_ratio': self._calculate_reduction_ratio(graph, mst)
         }
     
@@ -71,38 +81,39 @@ class MSTAnalyzer(GraphAnalyzer):
             ]
         }
     
-    def _prepare_graph(self, graph: nx.Graph) -> nx.Graph:
-        """Prepara el grafo transformando los pesos según el modo."""
-        G_prepared = graph.copy()
-        
-        for u, v, data in G_prepared.edges(data=True):
-            peso_original = data.get('peso', 1.0)
-            
-            if self.weight_mode == 'inverse':
-                data['mst_weight'] = 1.0 / (peso_original + 1e-10)
-            elif self.weight_mode == 'negative':
-                data['mst_weight'] = -peso_original
-            else:
-                data['mst_weight'] = peso_original
-        
-        return G_prepared
+    def _transform_weights(self, pesos: np.ndarray) -> np.ndarray:
+        """Transforma los pesos de contacto en pesos de MST según el modo."""
+        if self.weight_mode == 'inverse':
+            return 1.0 / (pesos + 1e-10)
+        elif self.weight_mode == 'negative':
+            return -pesos
+        return pesos
     
-    def _calculate_total_weight(self, mst: nx.Graph) -> float:
-        """Calcula peso total del MST."""
-        if mst.number_of_edges() == 0:
-            return 0.0
-        return sum(data.get('peso', 0.0) for _, _, data in mst.edges(data=True))
+    @staticmethod
+    def _weight_stats(weights: np.ndarray) -> Tuple[float, float]:
+        """Peso total y promedio de las aristas del MST."""
+        if len(weights) == 0:
+            return 0.0, 0.0
+        total = sum(weights.tolist())  # Suma secuencial: mismo redondeo que la versión sobre aristas
+        return total, total / len(weights)
     
-    def _calculate_avg_weight(self, mst: nx.Graph) -> float:
-        """Calcula peso promedio de aristas en MST."""
-        if mst.number_of_edges() == 0:
-            return 0.0
-        return self._calculate_total_weight(mst) / mst.number_of_edges()
+    @staticmethod
+    def _edge_arrays(mst: nx.Graph) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Aristas del MST como arrays paralelos (u, v, peso) en orden de iteración."""
+        edges = list(mst.edges(data='peso', default=0.0))
+        u = np.empty(len(edges), dtype=object)
+        v = np.empty(len(edges), dtype=object)
+        u[:] = [e[0] for e in edges]
+        v[:] = [e[1] for e in edges]
+        w = np.array([e[2] for e in edges], dtype=np.float64)
+        return u, v, w
     
-    def _find_critical_edges(self, mst: nx.Graph) -> List[Tuple[int, int, float]]:
+    def _find_critical_edges(self, edge_arrays: Tuple[np.ndarray, np.ndarray, np.ndarray]
+                             ) -> List[Tuple[int, int, float]]:
         """Encuentra aristas críticas (todas en MST) ordenadas por peso descendente."""
-        critical = [(u, v, data.get('peso', 0.0)) for u, v, data in mst.edges(data=True)]
-        return sorted(critical, key=lambda x: x[2], reverse=True)
+        u, v, w = edge_arrays
+        order = np.argsort(-w, kind='stable')  # Estable: empates en orden original
+        return list(zip(u[order].tolist(), v[order].tolist(), w[order].tolist()))
     
     def _calculate_reduction_ratio(self, original: nx.Graph, mst: nx.Graph) -> float:
         """Calcula ratio de reducción de aristas: 1 - (edges_mst / edges_original)."""
@@ -110,27 +121,26 @@ class MSTAnalyzer(GraphAnalyzer):
             return 0.0
         return 1.0 - (mst.number_of_edges() / original.number_of_edges())
     
-    def _classify_critical_nodes(self, mst: nx.Graph) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _classify_critical_nodes(node_ids: List[Any], betweenness: np.ndarray,
+                                 degrees: np.ndarray) -> List[Dict[str, Any]]:
         """
         Clasifica nodos críticos en el MST.
         
         - Vulnerable: Alto grado (>= mean + std) pero baja intermediación (<= median)
         - Bridge: Alta intermediación (>= mean + std)
         
+        Args:
+            node_ids: Nodos del MST (orden de mst.nodes())
+            betweenness: Betweenness precalculada, alineada con node_ids
+            degrees: Grado de cada nodo, alineado con node_ids
+        
         Returns:
             List of dicts with node_id, tipo, grado, betweenness, interpretacion
         """
-        if mst.number_of_nodes() < 2:
+        if len(node_ids) < 2:
             return []
         
-        # Calcular métricas
-        degree_dict = dict(mst.degree())
-        betweenness_dict = nx.betweenness_centrality(mst)
-        
-        # Convertir a arrays para estadísticas
-        degrees = np.array(list(degree_dict.values()))
-        betweenness = np.array(list(betweenness_dict.values()))
-        
         # Umbrales
         degree_mean = np.mean(degrees)
         degree_std = np.std(degrees)
@@ -141,41 +151,37 @@ class MSTAnalyzer(GraphAnalyzer):
         betweenness_threshold = betweenness_mean + betweenness_std
         betweenness_median = np.median(betweenness)
         
-        critical_nodes = []
-        
-        for node_id in mst.nodes():
-            deg = degree_dict[node_id]
-            bc = betweenness_dict[node_id]
-            
-            # Clasificar
-            if bc >= betweenness_threshold:
-                # Bridge: alta intermediación
-                tipo = "bridge"
-                if bc > betweenness_mean + 2 * betweenness_std:
-                    interpretacion = "Super-conector crítico - conecta múltiples grupos"
-                else:
-                    interpretacion = "Conector importante - enlace entre grupos"
-            elif deg >= degree_threshold and bc <= betweenness_median:
-                # Vulnerable: alto grado pero baja intermediación
-                tipo = "vulnerable"
-                if deg > degree_mean + 2 * degree_std:
-                    interpretacion = "Nodo muy vulnerable - muchas conexiones directas"
-                else:
-                    interpretacion = "Nodo vulnerable - alto contacto local"
-            else:
-                # No es crítico
-                continue
-            
-            critical_nodes.append({
-                'estudiante_id': str(node_id),
-                'tipo': tipo,
-                'grado': int(deg),
-                'betweenness': float(bc),
-                'interpretacion': interpretacion
-            })
-        
-        # Ordenar por betweenness descendente
-        critical_nodes.sort(key=lambda x: x['betweenness'], reverse=True)
+        # Clasificar (bridge tiene prioridad sobre vulnerable)
+        is_bridge = betweenness >= betweenness_threshold
+        is_vulnerable = ~is_bridge & (degrees >= degree_threshold) & (betweenness <= betweenness_median)
+        
+        tipos = np.select([is_bridge, is_vulnerable], ["bridge", "vulnerable"], default="")
+        interpretaciones = np.select(
+            [is_bridge & (betweenness > betweenness_mean + 2 * betweenness_std),
+             is_bridge,
+             is_vulnerable & (degrees > degree_mean + 2 * degree_std),
+             is_vulnerable],
+            ["Super-conector crítico - conecta múltiples grupos",
+             "Conector importante - enlace entre grupos",
+             "Nodo muy vulnerable - muchas conexiones directas",
+             "Nodo vulnerable - alto contacto local"],
+            default=""
+        )
+        
+        # Ordenar por betweenness descendente (estable: empates en orden de nodos)
+        selected = np.flatnonzero(is_bridge | is_vulnerable)
+        selected = selected[np.argsort(-betweenness[selected], kind='stable')]
+        
+        critical_nodes = [
+            {
+                'estudiante_id': str(node_ids[i]),
+                'tipo': str(tipos[i]),
+                'grado': int(degrees[i]),
+                'betweenness': float(betweenness[i]),
+                'interpretacion': str(interpretaciones[i])
+            }
+            for i in selected
+        ]
         
         return critical_nodes
     
@@ -206,23 +212,27 @@ class MSTComparator:
     @staticmethod
     def compare(original: nx.Graph, mst: nx.Graph) -> Dict[str, Any]:
         """Compara métricas entre grafo original y MST."""
+        # Conteos y densidades calculados una sola vez
+        nodes_o, edges_o = original.number_of_nodes(), original.number_of_edges()
+        nodes_m, edges_m = mst.number_of_nodes(), mst.number_of_edges()
+        density_o = nx.density(original) if nodes_o > 0 else 0
+        density_m = nx.density(mst) if nodes_m > 0 else 0
+        
         return {
             'original': {
-                'nodes': original.number_of_nodes(),
-                'edges': original.number_of_edges(),
-                'density': nx.density(original) if original.number_of_nodes() > 0 else 0
+                'nodes': nodes_o,
+                'edges': edges_o,
+                'density': density_o
             },
             'mst': {
-                'nodes': mst.number_of_nodes(),
-                'edges': mst.number_of_edges(),
-                'density': nx.density(mst) if mst.number_of_nodes() > 0 else 0
+                'nodes': nodes_m,
+                'edges': edges_m,
+                'density': density_m
             },
             'reduction': {
-                'edges_removed': original.number_of_edges() - mst.number_of_edges(),
-                'edge_reduction_pct': (1 - mst.number_of_edges() / original.number_of_edges() 
-                                      if original.number_of_edges() > 0 else 0) * 100,
-                'density_reduction_pct': (1 - (nx.density(mst) / nx.density(original))
-                                         if nx.density(original) > 0 else 0) * 100
+                'edges_removed': edges_o - edges_m,
+                'edge_reduction_pct': (1 - edges_m / edges_o if edges_o > 0 else 0) * 100,
+                'density_reduction_pct': (1 - (density_m / density_o) if density_o > 0 else 0) * 100
             }
         }
     
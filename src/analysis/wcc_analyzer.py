@@ -1,8 +1,12 @@
 """Analizador de Componentes Conexas Débilmente (WCC)."""
 import networkx as nx
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from typing import Dict, Any, List, Optional, Set, Tuple
 from .base import GraphAnalyzer
+from ..utils.helpers import top_k_indices
 
 
 class WCCAnalyzer(GraphAnalyzer):
@@ -13,25 +17,68 @@ class WCCAnalyzer(GraphAnalyzer):
         if graph.number_of_nodes() == 0:
             return {'num_componentes': 0, 'tamanos': [], 'componente_gigante': 0, 'componentes': []}
         
-        # Convertir a no dirigido para WCC
-        G_undirected = graph.to_undirected()
-        componentes = list(nx.connected_components(G_undirected))
+        # WCC en C (scipy) sobre la adyacencia CSR, sin copiar a un grafo no dirigido
+        componentes, tamanos, miembros = self._weak_components(graph)
         
         results = {
             'num_componentes': len(componentes),
-            'tamanos': sorted([len(c) for c in componentes], reverse=True),
-            'componente_gigante': len(max(componentes, key=len)) if componentes else 0,
-            'componentes': sorted(componentes, key=len, reverse=True)  # All components
+            'tamanos': tamanos,
+            'componente_gigante': tamanos[0] if tamanos else 0,
+            'componentes': componentes  # All components
         }
         
         if estudiantes is not None:
-            results['analisis_componentes'] = [
-                self._analyze_component(comp, estudiantes, graph)
-                for comp in results['componentes']
-            ]
+            # Índice id → fila y grados de salida calculados una sola vez para todas las componentes
+            id_to_row = {sid: row for row, sid in enumerate(estudiantes['id_estudiante'].tolist())}
+            node_ids = np.empty(graph.number_of_nodes(), dtype=object)
+            node_ids[:] = list(graph)
+            out_degrees = np.fromiter((d for _, d in graph.out_degree()), dtype=np.int64,
+                                      count=len(node_ids))
+            
+            results['analisis_componentes'] = []
+            for comp, members in zip(componentes, miembros):
+                # Los sucesores están en la misma componente: grado en el subgrafo = grado global
+                top = members[top_k_indices(out_degrees[members], 3)]
+                spreaders = list(zip(node_ids[top].tolist(), out_degrees[top].tolist()))
+                results['analisis_componentes'].append(
+                    self._analyze_component(comp, estudiantes, spreaders, id_to_row)
+                )
         
         return results
     
+    @staticmethod
+    def _weak_components(graph: nx.DiGraph) -> "tuple[List[Set], List[int], List[np.ndarray]]":
+        """
+        Componentes débiles ordenadas por tamaño descendente (empates en el orden
+        de NetworkX: por el primer nodo de cada componente en graph.nodes()).
+        
+        Returns:
+            (componentes, tamaños, posiciones de los miembros en graph.nodes() por componente)
+        """
+        nodes = list(graph.nodes())
+        n = len(nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        
+        src = np.fromiter((index[u] for u, _ in graph.edges()), dtype=np.int32,
+                          count=graph.number_of_edges())
+        dst = np.fromiter((index[v] for _, v in graph.edges()), dtype=np.int32,
+                          count=graph.number_of_edges())
+        adjacency = sp.csr_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n, n))
+        
+        # Etiquetas asignadas en orden del primer nodo de cada componente
+        _, labels = connected_components(adjacency, directed=True, connection='weak')
+        sizes = np.bincount(labels)
+        
+        # Miembros agrupados por etiqueta y orden estable por tamaño
+        node_array = np.empty(n, dtype=object)
+        node_array[:] = nodes
+        by_label = np.split(np.argsort(labels, kind='stable'), np.cumsum(sizes)[:-1])
+        order = np.argsort(-sizes, kind='stable')
+        
+        miembros = [by_label[k] for k in order]
+        componentes = [set(node_array[members].tolist()) for members in miembros]
+        return componentes, sizes[order].tolist(), miembros
+    
     def get_metrics(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Extrae métricas esenciales para backend/API."""
         metrics = {
@@ -64,19 +111,24 @@ class WCCAnalyzer(GraphAnalyzer):
     def _analyze_component(self, 
                           nodos: set, 
                           estudiantes: pd.DataFrame,
-                          graph: nx.DiGraph) -> Dict:
-        """Analiza un componente individual."""
-        df_comp = estudiantes[estudiantes['id_estudiante'].isin(nodos)]
+                          super_spreaders: List[Tuple[str, int]],
+                          id_to_row: Optional[Dict[str, int]] = None) -> Dict:
+        """
+        Analiza un componente individual (filas vía id_to_row, sin escanear estudiantes).
+        
+        Args:
+            super_spreaders: Top-3 (id, grado de salida) de la componente
+        """
+        if id_to_row is None:
+            id_to_row = {sid: row for row, sid in enumerate(estudiantes['id_estudiante'].tolist())}
+        
+        # Filas de la componente en el orden del CSV (igual que isin)
+        df_comp = estudiantes.iloc[sorted(id_to_row[n] for n in nodos if n in id_to_row)]
         
         # Obtener distribuciones
         carreras = df_comp['carrera'].value_counts().head(3).to_dict()
         anios = df_comp['anio_ingreso'].value_counts().head(3).to_dict()
         
-        # Encontrar super-propagadores
-        subgrafo = graph.subgraph(nodos)
-        out_degrees = dict(subgrafo.out_degree())
-        super_spreaders = sorted(out_degrees.items(), key=lambda x: x[1], reverse=True)[:3]
-        
         return {
             'tamano': len(nodos),
             'carreras': carreras,
@@ -86,8 +138,7 @@ class WCCAnalyzer(GraphAnalyzer):
                 {
                     'id': pid,
                     'contagios': count,
-                    'carrera': estudiantes[estudiantes['id_estudiante'] == pid]['carrera'].iloc[0]
-                    if len(estudiantes[estudiantes['id_estudiante'] == pid]) > 0 else 'N/A'
+                    'carrera': estudiantes['carrera'].iat[id_to_row[pid]] if pid in id_to_row else 'N/A'
                 }
                 for pid, count in super_spreaders if count > 0
             ]
@@ -1,5 +1,5 @@
 
-from .config import PATHS, GRID_CONFIG, SIM_CONFIG, VIZ_CONFIG
+from .config import PATHS, GRID_CONFIG, SIM_CONFIG, STORE_CONFIG, VIZ_CONFIG
 from .graph import ContactGraphBuilder, GraphAnalyzer
 from .epidemic import (
     VectorizedSIRSimulator,
@@ -11,6 +11,7 @@ __all__ = [
     'PATHS',
     'GRID_CONFIG',
     'SIM_CONFIG',
+    'STORE_CONFIG',
     'VIZ_CONFIG',
     'ContactGraphBuilder',
     'GraphAnalyzer',
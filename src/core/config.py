@@ -1,13 +1,15 @@
 """Inmutabilidad y seguridad de tipos."""
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 @dataclass(frozen=True)
 class Paths:
 
     DATA_DIR: Path = Path('data')
     OUTPUT_DIR: Path = Path('output')
+    CACHE_DIR: Path = Path('.cache')
     
     @property
     def estudiantes(self) -> Path:
@@ -48,6 +50,15 @@ class SimulationConfig:
     dias_semana: Tuple[str, ...] = ('Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes')
 
 
+@dataclass(frozen=True)
+class StoreConfig:
+    
+    # Redis para compartir simulaciones entre workers (None = memoria del proceso)
+    redis_url: Optional[str] = field(default_factory=lambda: os.environ.get('SIMULATION_REDIS_URL'))
+    ttl_seconds: int = 3600       # Expiración de cada simulación almacenada
+    max_entries: int = 1000       # Límite del backend en memoria (LRU)
+
+
 @dataclass(frozen=True)
 class VisualizationConfig:
     dpi: int = 300
@@ -59,10 +70,12 @@ class VisualizationConfig:
     color_edge: str = '#CCCCCC'
     edge_alpha: float = 0.3
     edge_width: float = 0.5
+    raster_min_nodes: int = 500  # Desde cuántos nodos se rasterizan las aristas
 
 
 # Singleton instances
 PATHS = Paths()
 GRID_CONFIG = GridConfig()
 SIM_CONFIG = SimulationConfig()
+STORE_CONFIG = StoreConfig()
 VIZ_CONFIG = VisualizationConfig()
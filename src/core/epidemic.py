@@ -1,7 +1,8 @@
 """Simulador SIR completamente vectorizado usando matrices sparse."""
 import numpy as np
 import scipy.sparse as sp
-from typing import List, Tuple, Set, Dict
+from typing import List, Tuple, Set, Dict, Optional
+from .propagation_numba import record_first_sources, sir_tick
 
 
 class VectorizedSIRSimulator:
@@ -9,10 +10,13 @@ class VectorizedSIRSimulator:
     - Multithreading automático vía vecLib/Accelerate
     - Vectorización SIMD optimizada para ARM64 """
     
-    def __init__(self, beta: float, num_nodes: int):
+    def __init__(self, beta: float, num_nodes: int, rng: Optional[np.random.Generator] = None):
         self.beta = beta
         self.num_nodes = num_nodes
         
+        # Generator (PCG64) en lugar del RandomState global de np.random
+        self.rng = rng if rng is not None else np.random.default_rng()
+        
         # Estados: 0=S (susceptible), 1=I (infectado)
         self.states = np.zeros(num_nodes, dtype=np.int8)
         
@@ -22,40 +26,43 @@ class VectorizedSIRSimulator:
         # Optimización 2: Cache de máscara de susceptibles (actualización incremental)
         self.susceptible_mask = np.ones(num_nodes, dtype=bool)
         
+        # Optimización 3: Buffer de salida del kernel Numba (nuevos infectados)
+        self.new_buffer = np.empty(num_nodes, dtype=np.int64)
+        
         # Matriz de contacto (se asignará externamente)
         self.contact_matrix: sp.csr_matrix = None
     
-    def initialize_infections(self, patient_zero_indices: np.ndarray):
-        """Inicializa infecciones con pacientes cero."""
+    def reset_states(self):
+        """Vuelve todos los nodos a susceptibles reutilizando los buffers."""
         self.states[:] = 0
         self.susceptible_mask[:] = True  # Resetear máscara
+    
+    def initialize_infections(self, patient_zero_indices: np.ndarray):
+        """Inicializa infecciones con pacientes cero."""
+        self.reset_states()
         if len(patient_zero_indices) > 0:
             self.states[patient_zero_indices] = 1
             self.susceptible_mask[patient_zero_indices] = False  # Marcar infectados
     
     def set_contact_matrix(self, matrix: sp.csr_matrix):
-        """Asigna la matriz de contacto para este día."""
+        """Asigna la matriz de contacto para este día (CSR canónica: índices ordenados, sin duplicados)."""
+        if not matrix.has_canonical_format:
+            matrix.sum_duplicates()  # También ordena los índices de cada fila
         self.contact_matrix = matrix
     
     def simulate_tick(self) -> Tuple[int, np.ndarray]:
-        """Simula un tick de transmisión vectorizado."""
+        """Simula un tick de transmisión (kernel Numba sobre los arrays CSR)."""
         if self.contact_matrix is None:
             return 0, np.array([], dtype=int)
         
-        # Vector de infectados
-        infected = (self.states == 1).astype(np.float32)
-        
-        # Exposición: producto matriz-vector sparse (optimizado por SciPy)
-        exposure = self.contact_matrix @ infected
-        
-        # Probabilidad de transmisión: P = 1 - exp(-β * E)
-        P = 1.0 - np.exp(-self.beta * exposure)
+        # Números aleatorios escritos directamente en el buffer (float32, sin copia)
+        self.rng.random(out=self.random_buffer, dtype=np.float32)
         
-        # Decisión estocástica vectorizada (usando buffer pre-asignado)
-        self.random_buffer[:] = np.random.rand(self.num_nodes)
-       
-        new_infections = (self.random_buffer < P) & self.susceptible_mask
-        new_indices = np.where(new_infections)[0]
+        # Exposición E = A·I y decisión rand < 1 - exp(-β·E), solo en susceptibles
+        matrix = self.contact_matrix
+        count = sir_tick(matrix.indptr, matrix.indices, matrix.data, self.states,
+                         np.float32(self.beta), self.random_buffer, self.new_buffer)
+        new_indices = self.new_buffer[:count].copy()
         
         if len(new_indices) > 0:
             self.states[new_indices] = 1
@@ -79,18 +86,68 @@ class VectorizedSIRSimulator:
         Returns:
             Dict {node_id: state}
         """
-        return {idx_to_node[i]: int(self.states[i]) for i in range(self.num_nodes)}
+        states = self.states.tolist()
+        return {idx_to_node[i]: states[i] for i in range(self.num_nodes)}
 
 
 class VectorizedPropagationTree:
     """Árbol de propagación simulador vectorizado."""
     
-    def __init__(self):
-        # Listas para almacenar transmisiones
-        self.sources: List[int] = []      # IDs de fuentes
-        self.targets: List[int] = []      # IDs de objetivos
-        self.weights: List[float] = []    # Pesos de contacto
-        self.days: List[str] = []         # Días de transmisión
+    def __init__(self, capacity: int = 1024):
+        # Transmisiones en arrays preasignados (la capacidad se duplica al llenarse)
+        self._src = np.empty(capacity, dtype=np.int32)    # Código de nodo fuente
+        self._dst = np.empty(capacity, dtype=np.int32)    # Código de nodo objetivo
+        self._w = np.empty(capacity, dtype=np.float64)    # Pesos de contacto
+        self._day = np.empty(capacity, dtype=np.int16)    # Índice en _day_names
+        self._count = 0
+        
+        # Códigos densos de nodo en orden de primera aparición (= orden de NetworkX)
+        self._node_ids: List = []
+        self._node_code: Dict = {}
+        self._day_names: List[str] = []
+    
+    @property
+    def sources(self) -> List:
+        """IDs de fuentes."""
+        return [self._node_ids[c] for c in self._src[:self._count].tolist()]
+    
+    @property
+    def targets(self) -> List:
+        """IDs de objetivos."""
+        return [self._node_ids[c] for c in self._dst[:self._count].tolist()]
+    
+    @property
+    def weights(self) -> List[float]:
+        """Pesos de contacto."""
+        return self._w[:self._count].tolist()
+    
+    @property
+    def days(self) -> List[str]:
+        """Días de transmisión."""
+        return [self._day_names[d] for d in self._day[:self._count].tolist()]
+    
+    def _encode(self, node_id) -> int:
+        code = self._node_code.get(node_id)
+        if code is None:
+            code = len(self._node_ids)
+            self._node_code[node_id] = code
+            self._node_ids.append(node_id)
+        return code
+    
+    def _reserve(self, extra: int):
+        """Garantiza espacio para `extra` transmisiones más (duplicando capacidad)."""
+        needed = self._count + extra
+        capacity = len(self._src)
+        if needed <= capacity:
+            return
+        
+        while capacity < needed:
+            capacity *= 2
+        for name in ('_src', '_dst', '_w', '_day'):
+            old = getattr(self, name)
+            grown = np.empty(capacity, dtype=old.dtype)
+            grown[:self._count] = old[:self._count]
+            setattr(self, name, grown)
     
     def record_transmissions(self, 
                             sources: np.ndarray,
@@ -98,45 +155,58 @@ class VectorizedPropagationTree:
                             contact_matrix: sp.csr_matrix,
                             day_name: str,
                             idx_to_node: Dict[int, int]):
-        """Registra múltiples transmisiones de forma vectorizada."""
-        for target_idx in targets:
-            # Obtener vecinos infectados que podrían haber transmitido
-            # Esto requiere buscar en la matriz sparse
-            row = contact_matrix[target_idx]
-            neighbor_indices = row.indices
-            neighbor_weights = row.data
-            
-            # Filtrar solo vecinos infectados (aproximación: usar último infectado)
-            # En realidad, múltiples infectados podrían transmitir, tomamos el primero
-            # que esté en sources
-            for i, neighbor_idx in enumerate(neighbor_indices):
-                if neighbor_idx in sources:
-                    source_id = idx_to_node[int(neighbor_idx)]
-                    target_id = idx_to_node[int(target_idx)]
-                    weight = float(neighbor_weights[i])
-                    
-                    self.sources.append(source_id)
-                    self.targets.append(target_id)
-                    self.weights.append(weight)
-                    self.days.append(day_name)
-                    break  # Solo registrar primera transmisión
+        """Registra múltiples transmisiones (bucle CSR compilado con Numba)."""
+        if len(targets) == 0:
+            return
+        
+        targets = np.asarray(targets, dtype=contact_matrix.indices.dtype)
+        infected_mask = np.zeros(contact_matrix.shape[0], dtype=np.bool_)
+        infected_mask[sources] = True
+        
+        out_src = np.empty(len(targets), dtype=contact_matrix.indices.dtype)
+        out_dst = np.empty(len(targets), dtype=contact_matrix.indices.dtype)
+        out_w = np.empty(len(targets), dtype=contact_matrix.data.dtype)
+        count = record_first_sources(
+            contact_matrix.indptr, contact_matrix.indices, contact_matrix.data,
+            infected_mask, targets, out_src, out_dst, out_w
+        )
+        if count == 0:
+            return
+        
+        if day_name not in self._day_names:
+            self._day_names.append(day_name)
+        day_code = self._day_names.index(day_name)
+        
+        self._reserve(count)
+        start, end = self._count, self._count + count
+        for k, (i, j) in enumerate(zip(out_src[:count].tolist(), out_dst[:count].tolist())):
+            self._src[start + k] = self._encode(idx_to_node[i])
+            self._dst[start + k] = self._encode(idx_to_node[j])
+        self._w[start:end] = out_w[:count]
+        self._day[start:end] = day_code
+        self._count = end
     
     def get_transmission_count(self) -> int:
         """Número total de transmisiones registradas."""
-        return len(self.sources)
+        return self._count
     
     def to_networkx(self):
         """Convierte a NetworkX DiGraph para compatibilidad."""
         import networkx as nx
         
+        n = self._count
+        node_ids = np.empty(len(self._node_ids), dtype=object)
+        node_ids[:] = self._node_ids
+        day_names = np.array(self._day_names, dtype=object)
+        
+        # Inserción en bloque: mismos nodos, aristas y orden que add_edge una a una
         G = nx.DiGraph()
-        for i in range(len(self.sources)):
-            G.add_edge(
-                self.sources[i],
-                self.targets[i],
-                peso=self.weights[i],
-                dia=self.days[i]
-            )
+        G.add_nodes_from(self._node_ids)
+        G.add_edges_from(zip(
+            node_ids[self._src[:n]].tolist(),
+            node_ids[self._dst[:n]].tolist(),
+            ({'peso': w, 'dia': d} for w, d in zip(self._w[:n].tolist(), day_names[self._day[:n]].tolist()))
+        ))
         
         return G
     
@@ -2,7 +2,8 @@
 import networkx as nx
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from scipy.spatial import cKDTree
+from typing import Dict, Tuple
 from src.core.sparse_network import SparseContactNetwork
 
 
@@ -18,94 +19,118 @@ class ContactGraphBuilder:
         if len(df_clase) == 0:
             return G
         
-        personas = df_clase[['persona_id', 'fila_asiento', 'columna_asiento']].values
-        duracion = df_clase['duracion_horas'].iloc[0] if len(df_clase) > 0 else 2.0
-        
-        # Cálculo optimizado de aristas
-        edges = self._calculate_edges_vectorized(personas, duracion)
-        G.add_weighted_edges_from(edges, weight='peso')
+        # Cálculo optimizado de aristas (arrays, un solo add en bloque)
+        u, v, pesos = self._class_edges(df_clase)
+        G.add_weighted_edges_from(zip(u.tolist(), v.tolist(), pesos.tolist()), weight='peso')
         
         return G
     
-    def _calculate_edges_vectorized(self, 
-                                    personas: np.ndarray, 
-                                    duracion: float) -> List[Tuple]:
-        """Cálculo COMPLETAMENTE vectorizado sin loops Python."""
-        n = len(personas)
+    def _class_edges(self, df_clase: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Aristas de una clase como arrays (u, v, peso), sin tuplas Python."""
+        personas = df_clase['persona_id'].to_numpy(dtype=object)
+        coords = df_clase[['fila_asiento', 'columna_asiento']].to_numpy(dtype=float)
+        duracion = df_clase['duracion_horas'].iloc[0]
+        
+        i_indices, j_indices, pesos = self._calculate_pair_weights(coords, duracion)
+        return personas[i_indices], personas[j_indices], pesos
+    
+    def _calculate_pair_weights(self,
+                                coords: np.ndarray,
+                                duracion: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pares vecinos (i < j, orden por filas) y sus pesos para una clase."""
+        n = len(coords)
         if n < 2:
-            return []
-        
-        # Broadcasting: calcular TODAS las distancias de una vez [n, n, 2]
-        coords = personas[:, 1:3].astype(float)  # [n, 2] (fila, columna)
-        coord_diff = coords[:, None, :] - coords[None, :, :]  # Broadcasting
+            return np.array([], dtype=int), np.array([], dtype=int), np.array([], dtype=float)
         
-        # Distancia Chebyshev (vecindad 3x3): max(|Δfila|, |Δcol|)
-        max_dist = np.max(np.abs(coord_diff), axis=2)  # [n, n]
+        # KD-tree: solo pares a distancia Chebyshev <= 1 (vecindad 3x3), O(n log n) sin matriz n×n
+        pairs = cKDTree(coords).query_pairs(r=self.MAX_PROXIMITY, p=np.inf, output_type='ndarray')
         
-        # Máscara: vecindad 3x3 Y triangular superior (evitar duplicados)
-        mask = (max_dist <= self.MAX_PROXIMITY) & np.triu(np.ones((n, n), dtype=bool), k=1)
+        if len(pairs) == 0:
+            return np.array([], dtype=int), np.array([], dtype=int), np.array([], dtype=float)
         
-        # Extraer índices de aristas válidas
-        i_indices, j_indices = np.where(mask)
-        
-        if len(i_indices) == 0:
-            return []
+        # Pares i < j en orden por filas (mismo orden que la triangular superior)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+        i_indices, j_indices = pairs[:, 0], pairs[:, 1]
         
         # Calcular pesos vectorizadamente
-        dist_euclidean = np.sqrt(np.sum(coord_diff[i_indices, j_indices]**2, axis=1))
+        coord_diff = coords[i_indices] - coords[j_indices]
+        dist_euclidean = np.sqrt(np.sum(coord_diff**2, axis=1))
         pesos = (1.0 / (1.0 + dist_euclidean)) * min(duracion, 1.5)
         
-        # Construir lista de aristas (IDs pueden ser strings)
-        edges = [(personas[i, 0], personas[j, 0], float(w)) 
-                 for i, j, w in zip(i_indices, j_indices, pesos)]
+        return i_indices, j_indices, pesos
+    
+    def build_daily_edges(self, df_dia: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Aristas únicas del día como arrays (u, v, peso), con peso máximo entre clases.
+        
+        El orden de las aristas reproduce la fusión clase por clase con NetworkX,
+        así los desempates posteriores (Kruskal, rankings) no cambian.
+        """
+        codes, node_ids = pd.factorize(df_dia['persona_id'])
+        node_ids = np.asarray(node_ids, dtype=object)
+        coords = df_dia[['fila_asiento', 'columna_asiento']].to_numpy(dtype=float)
+        duraciones = df_dia['duracion_horas'].to_numpy()
+        
+        stream_u, stream_v, stream_w = [], [], []
+        groups = df_dia.groupby('seccion_id').indices
+        
+        for seccion in sorted(groups):
+            rows = groups[seccion]
+            i, j, pesos = self._calculate_pair_weights(coords[rows], duraciones[rows[0]])
+            if len(i) == 0:
+                continue
+            
+            # Orden de G_clase.edges(): por primera aparición del extremo más antiguo
+            flat = np.column_stack((i, j)).ravel()
+            first_seen = np.empty(len(rows), dtype=np.int64)
+            seen_nodes, seen_at = np.unique(flat, return_index=True)
+            first_seen[seen_nodes] = seen_at
+            
+            swap = first_seen[j] < first_seen[i]
+            x = np.where(swap, j, i)
+            y = np.where(swap, i, j)
+            order = np.lexsort((np.arange(len(i)), first_seen[x]))
+            
+            stream_u.append(codes[rows[x[order]]])
+            stream_v.append(codes[rows[y[order]]])
+            stream_w.append(pesos[order])
+        
+        if not stream_u:
+            empty = np.array([], dtype=object)
+            return empty, empty, np.array([], dtype=float)
+        
+        u = np.concatenate(stream_u)
+        v = np.concatenate(stream_v)
+        w = np.concatenate(stream_w)
         
-        return edges
+        # Fusionar aristas repetidas entre clases: peso máximo, orden de primera aparición
+        key = np.minimum(u, v).astype(np.int64) * len(node_ids) + np.maximum(u, v)
+        _, first_idx, inverse = np.unique(key, return_index=True, return_inverse=True)
+        w_max = np.full(len(first_idx), -np.inf)
+        np.maximum.at(w_max, inverse.ravel(), w)
+        
+        order = np.argsort(first_idx)
+        first_idx = first_idx[order]
+        
+        return node_ids[u[first_idx]], node_ids[v[first_idx]], w_max[order]
     
     def build_daily_graph(self, df_dia: pd.DataFrame) -> nx.Graph:
         """Construye grafo diario fusionando todas las sesiones de clase."""
-        G_dia = nx.Graph()
+        u, v, pesos = self.build_daily_edges(df_dia)
         
-        for seccion, df_clase in df_dia.groupby('seccion_id'):
-            G_clase = self.build_class_graph(df_clase)
-            
-            # Fusionar grafos, manteniendo peso máximo
-            for u, v, data in G_clase.edges(data=True):
-                if G_dia.has_edge(u, v):
-                    G_dia[u][v]['peso'] = max(G_dia[u][v]['peso'], data['peso'])
-                else:
-                    G_dia.add_edge(u, v, peso=data['peso'])
+        G_dia = nx.Graph()
+        G_dia.add_weighted_edges_from(zip(u.tolist(), v.tolist(), pesos.tolist()), weight='peso')
         
         return G_dia
     
     def build_sparse_daily_network(self, df_dia: pd.DataFrame) -> SparseContactNetwork:
         """Construye red sparse directamente desde datos (optimizado)."""
-        all_edges = []
-        
-        # Recolectar aristas de todas las clases
-        for seccion, df_clase in df_dia.groupby('seccion_id'):
-            if len(df_clase) == 0:
-                continue
-            
-            personas = df_clase[['persona_id', 'fila_asiento', 'columna_asiento']].values
-            duracion = df_clase['duracion_horas'].iloc[0] if len(df_clase) > 0 else 2.0
-            
-            # Reutilizar cálculo vectorizado existente
-            class_edges = self._calculate_edges_vectorized(personas, duracion)
-            all_edges.extend(class_edges)
-        
-        # Fusionar aristas duplicadas (mantener peso máximo)
-        edge_dict = {}
-        for u, v, w in all_edges:
-            # Normalizar orden para grafo no dirigido
-            key = (min(u, v), max(u, v))
-            edge_dict[key] = max(edge_dict.get(key, 0), w)
-        
-        # Convertir a lista de aristas únicas
-        unique_edges = [(u, v, w) for (u, v), w in edge_dict.items()]
+        # Aristas únicas con peso máximo entre clases (fusión vectorizada de build_daily_edges)
+        u, v, pesos = self.build_daily_edges(df_dia)
         
         # Construir red sparse
         network = SparseContactNetwork()
-        network.build_from_edges(unique_edges)
+        network.build_from_arrays(u, v, pesos)
         
         return network
 
@@ -1,8 +1,24 @@
 
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Tuple, Hashable, Callable, BinaryIO
+from pathlib import Path
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import networkx as nx
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from .sparse_network import SparseContactNetwork
 from .graph import ContactGraphBuilder
+from .epidemic import VectorizedSIRSimulator
+from ..analysis.analyzers import DailyGraphAnalysisCoordinator
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class NetworkCacheManager:
@@ -13,39 +29,356 @@ class NetworkCacheManager:
     - Las redes son idénticas para el mismo día de la semana
     - Build once, reuse forever → 80% reducción en tiempo de construcción
     - Thread-safe para futuras extensiones
+    - Cache de redes acotado en bytes (LRU) para simulaciones con muchos días
     """
     
-    def __init__(self, graph_builder: ContactGraphBuilder):
+    # Formato del MST persistido (incrementar si cambian las claves de resultados)
+    MST_CACHE_FORMAT = 3
+    
+    # Formato de las redes persistidas (forma parte del hash del nombre de archivo)
+    NETWORK_CACHE_FORMAT = 1
+    
+    # Límite por defecto de memoria de las redes cacheadas (CSR: data + indices + indptr)
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    
+    def __init__(self, graph_builder: ContactGraphBuilder, persist_dir: Optional[Path] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
         self.graph_builder = graph_builder
-        self._cache: Dict[str, SparseContactNetwork] = {}
+        self.persist_dir = persist_dir  # None = sin persistencia en disco
+        self.max_bytes = max_bytes  # Menos bytes = menos redes retenidas (más reconstrucciones)
+        self._cache: "OrderedDict[str, SparseContactNetwork]" = OrderedDict()
+        self._network_bytes: Dict[str, int] = {}  # Bytes contabilizados al insertar cada red
+        self._total_bytes = 0
+        self._graph_cache: Dict[str, nx.Graph] = {}
+        self._mst_cache: Dict[Tuple[str, str, Hashable], Dict[str, Any]] = {}
+        self._mst_lock = threading.Lock()  # get_mst se llama desde varios hilos del executor MTC
+        self._coordinators: Dict[str, DailyGraphAnalysisCoordinator] = {}
+        self._simulators: Dict[str, VectorizedSIRSimulator] = {}
+        self._data_version: Hashable = None  # Versión de los datos de las redes/grafos en memoria
+        self._prebuilt: Dict[str, bool] = {}  # Días precargados aún no leídos → ¿se construyeron? (para las stats)
         self._cache_hits = 0
         self._cache_misses = 0
     
-    def get_or_build(self, dia_nombre: str, df_dia: pd.DataFrame) -> SparseContactNetwork:
+    def get_or_build(self, dia_nombre: str, df_dia: pd.DataFrame,
+                     id_to_gidx: Optional[Dict[str, int]] = None,
+                     version: Hashable = None) -> SparseContactNetwork:
         """
-        Obtiene red desde cache o construye nueva.
+        Obtiene red desde cache (memoria o disco) o construye nueva.
         
         Args:
             dia_nombre: Nombre del día (e.g., "Lunes")
             df_dia: DataFrame filtrado para ese día
+            id_to_gidx: Índice global de estudiantes; si se pasa, la red queda con
+                los mapeos local ↔ global precalculados (una vez por red)
+            version: Versión de los datos de entrada; sin versión no se usa el disco
             
         Returns:
             Red sparse (cacheada o recién construida)
         """
+        self._check_version(version)
+        # Los días de prebuild cuentan en su primera lectura según su origen (disco o construcción)
+        built = self._prebuilt.pop(dia_nombre, False)
         if dia_nombre in self._cache:
+            if built:
+                self._cache_misses += 1
+            else:
+                self._cache_hits += 1
+            network = self._cache[dia_nombre]
+            self._cache.move_to_end(dia_nombre)
+        else:
+            network = self._load_network(dia_nombre, version)
+            if network is not None:
+                self._cache_hits += 1
+            else:
+                # Cache miss: construir, persistir y almacenar
+                self._cache_misses += 1
+                network = self.graph_builder.build_sparse_daily_network(df_dia)
+                self._save_network(dia_nombre, version, network)
+            self._store_network(dia_nombre, network)
+        
+        if id_to_gidx is not None:
+            network.bind_global_index(id_to_gidx)
+        
+        return network
+    
+    def prebuild(self, daily_dataframes: Dict[str, pd.DataFrame],
+                 max_workers: Optional[int] = None, version: Hashable = None):
+        """
+        Construye en paralelo (hilos) las redes de los días que aún no están en cache.
+        
+        Los días son independientes para la construcción; la simulación SIR
+        sigue siendo secuencial y luego obtiene cada red con get_or_build.
+        
+        Args:
+            daily_dataframes: {dia_nombre: df_dia}
+            max_workers: Hilos del pool (por defecto, uno por día pendiente)
+            version: Versión de los datos (las redes persistidas se leen sin construir)
+        """
+        self._check_version(version)
+        missing = []
+        for dia, df_dia in daily_dataframes.items():
+            if dia in self._cache or len(df_dia) == 0:
+                continue
+            network = self._load_network(dia, version)
+            if network is not None:
+                self._prebuilt[dia] = False
+                self._store_network(dia, network)
+            else:
+                missing.append(dia)
+        if len(missing) < 2:
+            return  # Nada que paralelizar: get_or_build construye bajo demanda
+        
+        with ThreadPoolExecutor(max_workers=max_workers or len(missing)) as pool:
+            networks = pool.map(self.graph_builder.build_sparse_daily_network,
+                                [daily_dataframes[dia] for dia in missing])
+            for dia, network in zip(missing, networks):
+                self._prebuilt[dia] = True
+                self._save_network(dia, version, network)
+                self._store_network(dia, network)
+    
+    def _check_version(self, version: Hashable):
+        """Descarta redes, grafos y simuladores en memoria si cambió la versión de los datos."""
+        if version is None or version == self._data_version:
+            return
+        
+        if self._data_version is not None:
+            logger.info("Datos de entrada modificados: se descartan las redes diarias en memoria")
+        self._cache.clear()
+        self._network_bytes.clear()
+        self._total_bytes = 0
+        self._graph_cache.clear()
+        self._simulators.clear()
+        self._prebuilt.clear()
+        self._data_version = version
+    
+    def _store_network(self, dia_nombre: str, network: SparseContactNetwork):
+        """Inserta la red y expulsa las menos recientes mientras se supere max_bytes."""
+        self._cache[dia_nombre] = network
+        self._network_bytes[dia_nombre] = network.get_memory_usage()
+        self._total_bytes += self._network_bytes[dia_nombre]
+        
+        # La red recién insertada se conserva aunque por sí sola supere el límite
+        while self._total_bytes > self.max_bytes and len(self._cache) > 1:
+            dia_expulsado, _ = self._cache.popitem(last=False)
+            self._total_bytes -= self._network_bytes.pop(dia_expulsado)
+            # El simulador retiene la matriz de la red: liberarlo también
+            self._simulators.pop(dia_expulsado, None)
+            logger.debug(f"Red de {dia_expulsado} expulsada del cache (límite {self.max_bytes} bytes)")
+    
+    def _network_paths(self, dia_nombre: str, version: Hashable) -> Tuple[Path, Path]:
+        """Rutas (matriz .npz, IDs .npy) de la red; el sufijo cambia con formato y versión."""
+        suffix = hashlib.blake2b(repr((self.NETWORK_CACHE_FORMAT, version)).encode(),
+                                 digest_size=8).hexdigest()
+        base = f"red_{dia_nombre}_{suffix}"
+        return self.persist_dir / f"{base}.npz", self.persist_dir / f"{base}_ids.npy"
+    
+    def _load_network(self, dia_nombre: str, version: Hashable) -> Optional[SparseContactNetwork]:
+        """Lee la red persistida del día si existe para la misma versión de datos."""
+        if self.persist_dir is None or version is None:
+            return None
+        
+        matrix_path, ids_path = self._network_paths(dia_nombre, version)
+        if not (matrix_path.exists() and ids_path.exists()):
+            return None
+        
+        try:
+            matrix = sp.load_npz(matrix_path).tocsr()
+            node_ids = np.load(ids_path).astype(object)
+        except Exception as e:
+            logger.warning(f"No se pudo leer cache de red {matrix_path}: {str(e)}")
+            return None
+        return SparseContactNetwork.from_csr(matrix, node_ids)
+    
+    def _save_network(self, dia_nombre: str, version: Hashable, network: SparseContactNetwork):
+        """Persiste la matriz CSR y los IDs del día (reemplaza versiones anteriores)."""
+        if self.persist_dir is None or version is None:
+            return
+        
+        matrix_path, ids_path = self._network_paths(dia_nombre, version)
+        try:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+            for stale in self.persist_dir.glob(f"red_{dia_nombre}_*"):
+                if stale not in (matrix_path, ids_path):
+                    stale.unlink(missing_ok=True)
+            matrix = network.get_matrix()
+            self._atomic_write(matrix_path, lambda f: sp.save_npz(f, matrix, compressed=False))
+            # IDs como unicode: np.load sin allow_pickle
+            node_ids = network.node_ids.astype(str)
+            self._atomic_write(ids_path, lambda f: np.save(f, node_ids))
+        except OSError as e:
+            logger.warning(f"No se pudo guardar cache de red: {str(e)}")
+    
+    def get_daily_graph(self, dia_nombre: str, df_dia: pd.DataFrame,
+                        version: Hashable = None) -> nx.Graph:
+        """
+        Obtiene el grafo NetworkX del día (para visualización) desde cache o lo construye.
+        
+        Se usa build_daily_graph (no la red sparse) para conservar el orden de
+        nodos y, con él, los layouts de las visualizaciones. Con version, un
+        cambio de los datos descarta los grafos cacheados.
+        """
+        self._check_version(version)
+        if dia_nombre in self._graph_cache:
             self._cache_hits += 1
-            return self._cache[dia_nombre]
+            return self._graph_cache[dia_nombre]
         
-        # Cache miss: construir y almacenar
         self._cache_misses += 1
-        network = self.graph_builder.build_sparse_daily_network(df_dia)
-        self._cache[dia_nombre] = network
+        G_dia = self.graph_builder.build_daily_graph(df_dia)
+        self._graph_cache[dia_nombre] = G_dia
         
-        return network
+        return G_dia
+    
+    def get_simulator(self,
+                      dia_nombre: str,
+                      beta: float,
+                      network: SparseContactNetwork,
+                      rng: Optional[np.random.Generator] = None) -> VectorizedSIRSimulator:
+        """
+        Obtiene el simulador SIR del día, reutilizando sus buffers entre simulaciones.
+        
+        Args:
+            dia_nombre: Nombre del día (e.g., "Lunes")
+            beta: Tasa de transmisión (solo se actualiza el atributo en un hit)
+            network: Red sparse del día (la de get_or_build)
+            rng: Generator para los sorteos de contagio (None = el actual / uno nuevo)
+            
+        Returns:
+            Simulador con la matriz de contacto asignada y estados reseteados
+        """
+        simulator = self._simulators.get(dia_nombre)
+        
+        if simulator is None or simulator.contact_matrix is not network.get_matrix():
+            simulator = VectorizedSIRSimulator(beta, network.get_node_count(), rng=rng)
+            simulator.set_contact_matrix(network.get_matrix())
+            self._simulators[dia_nombre] = simulator
+        else:
+            simulator.beta = beta
+            if rng is not None:
+                simulator.rng = rng
+            simulator.reset_states()
+        
+        return simulator
+    
+    def get_mst(self,
+                dia_nombre: str,
+                weight_mode: str,
+                df_dia: pd.DataFrame,
+                version: Hashable = None) -> Dict[str, Any]:
+        """
+        Obtiene el análisis MST del día desde cache (memoria o disco) o lo calcula.
+        
+        Args:
+            dia_nombre: Nombre del día (e.g., "Lunes")
+            weight_mode: Modo de pesos del MST ('inverse', 'direct', ...)
+            df_dia: DataFrame filtrado para ese día (solo se usa si hay que construir)
+            version: Versión de los datos de entrada (e.g., mtimes de los CSV)
+            
+        Returns:
+            Resultados de MSTAnalyzer más 'num_aristas_originales' del grafo diario
+        """
+        key = (dia_nombre, weight_mode, version)
+        with self._mst_lock:
+            cached = self._mst_cache.get(key)
+        if cached is not None:
+            self._cache_hits += 1
+            return cached
+        
+        mst_results = self._load_mst(dia_nombre, weight_mode, version)
+        if mst_results is not None:
+            self._cache_hits += 1
+            self._store_mst(key, mst_results)
+            return mst_results
+        
+        # Cache miss: construir grafo diario y analizar MST
+        self._cache_misses += 1
+        G_dia = self.graph_builder.build_daily_graph(df_dia)
+        mst_results = self._get_coordinator(weight_mode).run_all_analyses(G_dia, verbose=False)['mst']
+        mst_results['num_aristas_originales'] = G_dia.number_of_edges()
+        
+        self._store_mst(key, mst_results)
+        self._save_mst(dia_nombre, weight_mode, version, mst_results)
+        
+        return mst_results
+    
+    def _store_mst(self, key: Tuple[str, str, Hashable], mst_results: Dict[str, Any]):
+        """Guarda un MST en memoria descartando los de otras versiones de los datos."""
+        version = key[2]
+        with self._mst_lock:
+            for stale in [k for k in self._mst_cache if k[2] != version]:
+                self._mst_cache.pop(stale, None)
+            self._mst_cache[key] = mst_results
+    
+    def _get_coordinator(self, weight_mode: str) -> DailyGraphAnalysisCoordinator:
+        """Retorna el coordinador MST del modo de pesos (una instancia por modo)."""
+        if weight_mode not in self._coordinators:
+            self._coordinators[weight_mode] = DailyGraphAnalysisCoordinator(weight_mode=weight_mode)
+        return self._coordinators[weight_mode]
+    
+    def _mst_path(self, dia_nombre: str, weight_mode: str) -> Path:
+        return self.persist_dir / f"mst_{dia_nombre}_{weight_mode}.pkl"
+    
+    def _load_mst(self, dia_nombre: str, weight_mode: str,
+                  version: Hashable) -> Optional[Dict[str, Any]]:
+        """Lee el MST persistido si existe y corresponde a la misma versión de datos."""
+        if self.persist_dir is None:
+            return None
+        
+        path = self._mst_path(dia_nombre, weight_mode)
+        if not path.exists():
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                stored = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"No se pudo leer cache MST {path}: {str(e)}")
+            return None
+        
+        if stored.get('format') != self.MST_CACHE_FORMAT or stored.get('version') != version:
+            return None
+        return stored['results']
+    
+    def _save_mst(self, dia_nombre: str, weight_mode: str,
+                  version: Hashable, mst_results: Dict[str, Any]):
+        """Persiste el MST en disco para mantener el cache entre reinicios."""
+        if self.persist_dir is None:
+            return
+        
+        try:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+            payload = {'format': self.MST_CACHE_FORMAT, 'version': version, 'results': mst_results}
+            self._atomic_write(self._mst_path(dia_nombre, weight_mode),
+                               lambda f: pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError as e:
+            logger.warning(f"No se pudo guardar cache MST: {str(e)}")
+    
+    def _atomic_write(self, path: Path, write: Callable[[BinaryIO], Any]):
+        """
+        Escribe un archivo del cache en un temporal de persist_dir y lo mueve con os.replace.
+        
+        Así un lector (u otro worker escribiendo el mismo archivo) nunca ve un
+        archivo a medio escribir.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.persist_dir, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
     
     def clear_cache(self):
         """Limpia el cache completamente."""
         self._cache.clear()
+        self._network_bytes.clear()
+        self._total_bytes = 0
+        self._graph_cache.clear()
+        with self._mst_lock:
+            self._mst_cache.clear()
+        self._simulators.clear()
+        self._prebuilt.clear()
+        self._data_version = None
         self._cache_hits = 0
         self._cache_misses = 0
     
@@ -58,7 +391,9 @@ class NetworkCacheManager:
             'hits': self._cache_hits,
             'misses': self._cache_misses,
             'hit_rate': hit_rate,
-            'cached_days': len(self._cache)
+            'cached_days': len(self._cache),
+            'cached_bytes': self._total_bytes,
+            'cached_msts': len(self._mst_cache)
         }
     
     def get_cached_network(self, dia_nombre: str) -> Optional[SparseContactNetwork]:
@@ -0,0 +1,72 @@
+"""Kernels del modelo SIR sobre arrays CSR compilados con Numba."""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def sir_tick(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+             states: np.ndarray, beta: np.float32, rand_buf: np.ndarray,
+             new_out: np.ndarray) -> int:
+    """
+    Un tick de transmisión: exposición E = A·I por fila y contagio si rand < 1 - exp(-β·E).
+
+    La exponencial solo se evalúa para susceptibles con exposición > 0.
+
+    Solo se evalúan los susceptibles; los estados no se modifican aquí para que
+    los contagios del tick no propaguen dentro del mismo tick.
+
+    Args:
+        indptr, indices, data: Arrays de la matriz de contacto CSR (float32)
+        states: Estados actuales (0=S, 1=I)
+        beta: Tasa de transmisión
+        rand_buf: Un número aleatorio uniforme por nodo
+        new_out: Buffer de salida (tamaño >= número de nodos)
+
+    Returns:
+        Número de nuevos infectados escritos (en orden ascendente) en new_out
+    """
+    count = 0
+    for i in range(states.shape[0]):
+        if states[i] != 0:
+            continue
+
+        exposure = np.float32(0.0)
+        for k in range(indptr[i], indptr[i + 1]):
+            if states[indices[k]] == 1:
+                exposure += data[k]
+
+        # 1 - exp(-x) = -expm1(-x): sin cancelación cuando β·E es pequeño
+        if exposure > 0 and rand_buf[i] < -np.expm1(-beta * exposure):
+            new_out[count] = i
+            count += 1
+    return count
+
+
+@njit(cache=True)
+def record_first_sources(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                         infected_mask: np.ndarray, targets: np.ndarray,
+                         out_src: np.ndarray, out_dst: np.ndarray, out_w: np.ndarray) -> int:
+    """
+    Para cada nuevo infectado toma el primer vecino infectado de su fila CSR.
+
+    Args:
+        indptr, indices, data: Arrays de la matriz de contacto CSR
+        infected_mask: Máscara booleana de infectados (incluye los nuevos)
+        targets: Índices de los nuevos infectados
+        out_src, out_dst, out_w: Buffers de salida (tamaño >= len(targets))
+
+    Returns:
+        Número de transmisiones escritas en los buffers
+    """
+    count = 0
+    for t in range(targets.shape[0]):
+        target = targets[t]
+        for k in range(indptr[target], indptr[target + 1]):
+            neighbor = indices[k]
+            if infected_mask[neighbor]:
+                out_src[count] = neighbor
+                out_dst[count] = target
+                out_w[count] = data[k]
+                count += 1
+                break  # Solo registrar primera transmisión
+    return count
@@ -1,7 +1,8 @@
 """Módulo de red de contacto usando matrices sparse CSR para optimización."""
 import numpy as np
+import pandas as pd
 import scipy.sparse as sp
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 
 
 class SparseContactNetwork:
@@ -9,59 +10,122 @@ class SparseContactNetwork:
     Red de contacto usando matriz sparse CSR (Compressed Sparse Row).
     """
     
+    # Atributos fijos (sin __dict__ por instancia; las redes viven en el cache)
+    __slots__ = ('num_nodes', 'matrix', 'node_ids', '_node_to_idx',
+                 '_global_index_owner', 'local_to_global', 'global_to_local', '_local_valid')
+    
     def __init__(self, num_nodes: int = 0):
         self.num_nodes = num_nodes
-        self.node_to_idx: Dict[int, int] = {}  # Mapeo ID → índice
-        self.idx_to_node: Dict[int, int] = {}  # Mapeo índice → ID
         self.matrix: sp.csr_matrix = None      # Matriz CSR de pesos
+        
+        # índice → ID: array ordenado (búsqueda inversa con searchsorted)
+        self.node_ids: np.ndarray = np.empty(0, dtype=object)
+        self._node_to_idx: Optional[Dict[str, int]] = None  # dict ID → índice bajo demanda
+        
+        # Índice global de estudiantes (ver bind_global_index)
+        self._global_index_owner: Optional[Dict[str, int]] = None
+        self.local_to_global: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.global_to_local: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._local_valid: Optional[np.ndarray] = None  # None = todos los nodos tienen índice global
+    
+    @classmethod
+    def from_csr(cls, matrix: sp.csr_matrix, node_ids: np.ndarray) -> 'SparseContactNetwork':
+        """
+        Reconstruye la red desde una matriz CSR ya construida (e.g., leída de disco).
+        
+        Args:
+            matrix: Matriz CSR canónica de pesos
+            node_ids: IDs de los nodos en el orden de las filas (ordenados)
+        """
+        network = cls(matrix.shape[0])
+        network.node_ids = np.asarray(node_ids, dtype=object)
+        network.matrix = matrix
+        return network
     
     def build_from_edges(self, edges: List[Tuple[int, int, float]]):
         """
         Construye matriz CSR desde lista de aristas.
         
+        Se mantiene por compatibilidad: el formato de tuplas (AoS) obliga a
+        desempaquetar cada arista en Python; preferir build_from_arrays (SoA).
+        
         Args:
             edges: Lista de (source, target, weight)
         """
         if not edges:
-            self.num_nodes = 0
-            self.matrix = sp.csr_matrix((0, 0), dtype=np.float32)
+            self._set_empty()
             return
         
-        # Extraer nodos únicos
-        unique_nodes = set()
-        for u, v, _ in edges:
-            unique_nodes.add(u)
-            unique_nodes.add(v)
-        
-        # Crear mapeos bidireccionales
-        sorted_nodes = sorted(unique_nodes)
-        self.num_nodes = len(sorted_nodes)
-        
-        for idx, node_id in enumerate(sorted_nodes):
-            self.node_to_idx[node_id] = idx
-            self.idx_to_node[idx] = node_id
-        
-        # Construir listas para formato COO (Coordinate)
-        row, col, data = [], [], []
-        
-        for u, v, weight in edges:
-            i = self.node_to_idx[u]
-            j = self.node_to_idx[v]
-            
-            # Grafo no dirigido: añadir ambas direcciones
-            row.extend([i, j])
-            col.extend([j, i])
-            data.extend([weight, weight])
-        
-        # Crear matriz sparse en formato CSR
-        self.matrix = sp.csr_matrix(
-            (data, (row, col)),
+        # Desempaquetar una sola vez a arrays y delegar en la construcción vectorizada
+        sources, targets, weights = zip(*edges)
+        u = np.empty(len(edges), dtype=object)
+        v = np.empty(len(edges), dtype=object)
+        u[:] = sources
+        v[:] = targets
+        self.build_from_arrays(u, v, np.fromiter(weights, dtype=np.float64, count=len(edges)))
+    
+    def build_from_arrays(self, u: np.ndarray, v: np.ndarray, weights: np.ndarray):
+        """
+        Construye matriz CSR desde arrays de aristas (duplicados sumados, como en COO).
+        
+        Args:
+            u, v: IDs de los extremos de cada arista (array object)
+            weights: Peso de cada arista
+        """
+        if len(u) == 0:
+            self._set_empty()
+            return
+        
+        # Códigos por hash (factorize) y orden solo sobre los nodos únicos
+        codes, uniques = pd.factorize(np.concatenate((u, v)))
+        order = np.argsort(np.asarray(uniques, dtype=object))
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        codes = rank[codes]
+        
+        self.num_nodes = len(order)
+        self.node_ids = np.asarray(uniques, dtype=object)[order]
+        self._node_to_idx = None
+        
+        # Grafo no dirigido: ambas direcciones, intercaladas por arista (i→j, j→i)
+        i, j = codes[:len(u)], codes[len(u):]
+        self.matrix = self._to_csr(np.column_stack((i, j)).ravel(), np.column_stack((j, i)).ravel(),
+                                   np.repeat(np.asarray(weights), 2))
+    
+    def _set_empty(self):
+        """Red sin aristas."""
+        self.num_nodes = 0
+        self.node_ids = np.empty(0, dtype=object)
+        self._node_to_idx = None
+        self.matrix = sp.csr_matrix((0, 0), dtype=np.float32)
+    
+    @property
+    def idx_to_node(self) -> np.ndarray:
+        """Mapeo índice → ID (array: idx_to_node[i] como con el antiguo dict)."""
+        return self.node_ids
+    
+    @property
+    def node_to_idx(self) -> Dict[str, int]:
+        """Mapeo ID → índice como dict (compatibilidad; se construye solo si se usa)."""
+        if self._node_to_idx is None:
+            self._node_to_idx = {node_id: idx for idx, node_id in enumerate(self.node_ids.tolist())}
+        return self._node_to_idx
+    
+    def _to_csr(self, row: np.ndarray, col: np.ndarray, data: np.ndarray) -> sp.csr_matrix:
+        """CSR canónica con datos float32 e índices int32 (mitad de bytes por tick que float64/int64)."""
+        # Un solo paso COO → CSR: tocsr ya suma duplicados y ordena índices (forma canónica),
+        # así que no hace falta un sum_duplicates() adicional. Coordenadas int32 para el sort.
+        matrix = sp.coo_matrix(
+            (data.astype(np.float32, copy=False),
+             (row.astype(np.int32, copy=False), col.astype(np.int32, copy=False))),
             shape=(self.num_nodes, self.num_nodes),
             dtype=np.float32
-        )
+        ).tocsr()
         
-        # Eliminar duplicados sumando (por si acaso)
-        self.matrix.sum_duplicates()
+        # scipy elige int64 si lo considera necesario: forzar int32 (válido mientras nnz < 2³¹)
+        matrix.indices = matrix.indices.astype(np.int32, copy=False)
+        matrix.indptr = matrix.indptr.astype(np.int32, copy=False)
+        return matrix
     
     def get_matrix(self) -> sp.csr_matrix:
         """Devuelve la matriz CSR."""
@@ -76,12 +140,59 @@ class SparseContactNetwork:
         return self.matrix.nnz // 2  # Dividir por 2 porque es simétrica
     
     def map_ids_to_indices(self, node_ids: List[int]) -> np.ndarray:
-        """Convierte IDs de nodos a índices de matriz."""
-        return np.array([self.node_to_idx[nid] for nid in node_ids if nid in self.node_to_idx])
+        """Convierte IDs de nodos a índices de matriz (searchsorted sobre node_ids; ignora los ausentes)."""
+        ids = np.empty(len(node_ids), dtype=object)
+        ids[:] = list(node_ids)
+        if self.num_nodes == 0 or len(ids) == 0:
+            return np.array([], dtype=np.intp)
+        
+        pos = np.minimum(np.searchsorted(self.node_ids, ids), self.num_nodes - 1)
+        return pos[self.node_ids[pos] == ids]
     
     def map_indices_to_ids(self, indices: np.ndarray) -> List[int]:
         """Convierte índices de matriz a IDs de nodos."""
-        return [self.idx_to_node[int(idx)] for idx in indices]
+        return self.node_ids[indices].tolist()
+    
+    def bind_global_index(self, id_to_gidx: Dict[str, int]):
+        """
+        Precalcula los mapeos índice local ↔ índice global (-1 si no existe).
+        
+        Se recalcula solo si cambia el diccionario id_to_gidx (la red está cacheada).
+        """
+        if self._global_index_owner is id_to_gidx:
+            return
+        
+        missing = -1
+        self.local_to_global = np.fromiter(
+            (id_to_gidx.get(node_id, missing) for node_id in self.node_ids),
+            dtype=np.int32, count=self.num_nodes
+        )
+        self.global_to_local = np.full(len(id_to_gidx), missing, dtype=np.int32)
+        valid = self.local_to_global >= 0
+        self.global_to_local[self.local_to_global[valid]] = np.flatnonzero(valid)
+        self._local_valid = None if valid.all() else valid
+        self._global_index_owner = id_to_gidx
+    
+    def infected_local_indices(self, global_states: np.ndarray) -> np.ndarray:
+        """
+        Índices locales de los nodos infectados según los estados globales (0/1).
+        
+        Gather O(nodos de la red) con local_to_global en lugar de recorrer los N
+        estudiantes con flatnonzero + map_global_to_indices.
+        """
+        if self._local_valid is None:
+            return np.flatnonzero(global_states[self.local_to_global])
+        return np.flatnonzero(global_states[self.local_to_global] & self._local_valid)
+    
+    def map_global_to_indices(self, global_indices: np.ndarray) -> np.ndarray:
+        """Versión vectorizada de map_ids_to_indices para índices globales."""
+        local = self.global_to_local[global_indices]
+        return local[local >= 0]
+    
+    def map_indices_to_global(self, indices: np.ndarray) -> np.ndarray:
+        """Versión vectorizada de map_indices_to_ids que retorna índices globales."""
+        global_indices = self.local_to_global[indices]
+        return global_indices[global_indices >= 0]
     
     def get_memory_usage(self) -> int:
         """Retorna uso de memoria en bytes."""
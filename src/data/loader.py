@@ -1,11 +1,19 @@
 """Módulo de carga y validación de datos con principios SOLID."""
+import importlib.util
+import os
 import pandas as pd
 from pathlib import Path
 from typing import Tuple, Dict
 from abc import ABC, abstractmethod
 
+# Parser multihilo de PyArrow si está instalado (dependencia opcional); si no, motor C
+CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+
 
 class DataValidator(ABC):
+    
+    DTYPES: Dict[str, str] = {}  # Tipos explícitos al leer el CSV (sin inferencia)
+    
     @abstractmethod
     def validate(self, df: pd.DataFrame) -> pd.DataFrame:
         pass
@@ -14,13 +22,14 @@ class DataValidator(ABC):
 class EstudiantesValidator(DataValidator):
      
     REQUIRED_COLS = ['id_estudiante', 'carrera', 'anio_ingreso'] # Columnas obligatorias
+    DTYPES = {'id_estudiante': 'str', 'carrera': 'str'}
     
     def validate(self, df: pd.DataFrame) -> pd.DataFrame:
         missing = set(self.REQUIRED_COLS) - set(df.columns)
         if missing:
             raise ValueError(f"Columnas faltantes en estudiantes: {missing}")
         
-        if df['id_estudiante'].duplicated().any():
+        if not df['id_estudiante'].is_unique:  # Un solo chequeo por hash, sin máscara booleana
             raise ValueError("IDs de estudiantes duplicados encontrados")
         
         return df
@@ -30,6 +39,7 @@ class ClasesValidator(DataValidator):
 
     REQUIRED_COLS = ['id_clase', 'nombre_clase', 'salon', 'dia_semana', #Columnas obligatorias
                      'horario_inicio', 'horario_fin', 'max_estudiantes'] 
+    DTYPES = {'id_clase': 'str', 'dia_semana': 'str', 'horario_inicio': 'str', 'horario_fin': 'str'}
     
     def validate(self, df: pd.DataFrame) -> pd.DataFrame:
         missing = set(self.REQUIRED_COLS) - set(df.columns)
@@ -41,13 +51,15 @@ class ClasesValidator(DataValidator):
 class AsistenciasValidator(DataValidator):
   
     REQUIRED_COLS = ['id_estudiante', 'id_clase', 'pos_x', 'pos_y'] # Columnas obligatorias
+    DTYPES = {'id_estudiante': 'str', 'id_clase': 'str'}
     
     def validate(self, df: pd.DataFrame) -> pd.DataFrame:
         missing = set(self.REQUIRED_COLS) - set(df.columns)
         if missing:
             raise ValueError(f"Columnas faltantes en asistencias: {missing}")
         
-        if df[['pos_x', 'pos_y']].isnull().any().any():
+        # Por columna sobre el array NumPy: sin DataFrame booleano intermedio, corta en pos_x
+        if df['pos_x'].isna().to_numpy().any() or df['pos_y'].isna().to_numpy().any():
             raise ValueError("Posiciones de asientos incompletas")
         
         return df
@@ -86,11 +98,24 @@ class DataLoader:
             self.validators['asistencias']
         )
         
+        # IDs como str una sola vez (sin coerciones str() aguas abajo)
+        estudiantes['id_estudiante'] = estudiantes['id_estudiante'].astype(str)
+        clases['id_clase'] = clases['id_clase'].astype(str)
+        asistencias = asistencias.astype({'id_estudiante': str, 'id_clase': str})
+        
         return estudiantes, clases, asistencias
     
+    def get_data_version(self) -> Tuple[float, float, float]:
+        """Retorna las fechas de modificación de los CSV (clave de invalidación de caches)."""
+        return (
+            os.path.getmtime(self.estudiantes_path),
+            os.path.getmtime(self.clases_path),
+            os.path.getmtime(self.asistencias_path)
+        )
+    
     def _load_and_validate(self, path: Path, validator: DataValidator) -> pd.DataFrame:
         try:
-            df = pd.read_csv(path)
+            df = pd.read_csv(path, engine=CSV_ENGINE, dtype=validator.DTYPES or None)
             return validator.validate(df)
         except FileNotFoundError:
             raise FileNotFoundError(f"Archivo no encontrado: {path}")
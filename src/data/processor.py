@@ -1,7 +1,9 @@
 """Módulo de procesamiento y transformación de datos."""
+import numpy as np
 import pandas as pd
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Optional
 from ..core.config import GRID_CONFIG
+from .loader import DataLoader
 
 
 class DataProcessor:
@@ -14,6 +16,53 @@ class DataProcessor:
     
     def __init__(self, grid_config=GRID_CONFIG):
         self.grid_config = grid_config
+        self._unified_cache: Optional[Tuple[Tuple[float, ...], pd.DataFrame, pd.DataFrame]] = None
+        self._student_index_cache: Optional[Tuple[Tuple[float, ...], np.ndarray, Dict[str, int]]] = None
+        self._daily_cache: Optional[Tuple[Tuple[float, ...], Dict[str, pd.DataFrame]]] = None
+    
+    def get_unified_dataframe(self, loader: DataLoader) -> pd.DataFrame:
+        """Retorna el DataFrame unificado, reconstruyéndolo solo si cambian los CSV."""
+        version = loader.get_data_version()
+        
+        if self._unified_cache is None or self._unified_cache[0] != version:
+            estudiantes, clases, asistencias = loader.load_all()
+            df = self.create_unified_dataframe(estudiantes, clases, asistencias)
+            self._unified_cache = (version, estudiantes, df)
+        
+        return self._unified_cache[2]
+    
+    def get_estudiantes(self, loader: DataLoader) -> pd.DataFrame:
+        """Retorna el DataFrame de estudiantes cargado junto al unificado (mismo cache)."""
+        self.get_unified_dataframe(loader)
+        return self._unified_cache[1]
+    
+    def get_student_index(self, loader: DataLoader) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        Retorna el índice global de estudiantes (orden del CSV).
+        
+        Returns:
+            (gidx_to_id: array object de IDs str, id_to_gidx: {id: índice global})
+        """
+        version = loader.get_data_version()
+        
+        if self._student_index_cache is None or self._student_index_cache[0] != version:
+            ids = self.get_estudiantes(loader)['id_estudiante'].to_numpy(dtype=object)
+            id_to_gidx = {sid: gidx for gidx, sid in enumerate(ids.tolist())}
+            self._student_index_cache = (version, ids, id_to_gidx)
+        
+        return self._student_index_cache[1], self._student_index_cache[2]
+    
+    def get_daily_dataframes(self, loader: DataLoader) -> Dict[str, pd.DataFrame]:
+        """Retorna {dia: df_dia} precalculado a partir del DataFrame unificado cacheado."""
+        version = loader.get_data_version()
+        
+        if self._daily_cache is None or self._daily_cache[0] != version:
+            df = self.get_unified_dataframe(loader)
+            day_index = self.create_day_index(df)
+            by_day = {dia: day_index.get(dia, df.iloc[:0].copy()) for dia in self.DIA_MAP}
+            self._daily_cache = (version, by_day)
+        
+        return self._daily_cache[1]
     
     def create_unified_dataframe(self, 
                                 estudiantes: pd.DataFrame,
@@ -25,15 +74,14 @@ class DataProcessor:
         
         # Agregar campos calculados
         df['dia_orden'] = df['dia_semana'].map(self.DIA_MAP)
-        df['duracion_horas'] = df.apply(
-            lambda r: self._calcular_duracion(r['horario_inicio'], r['horario_fin']), 
-            axis=1
-        )
+        df['duracion_horas'] = self._calcular_duraciones(df['horario_inicio'], df['horario_fin'])
         
-        # Agregar dimensiones de cuadrícula
-        grids = df['max_estudiantes'].apply(self.grid_config.get_grid)
-        df['filas_asientos'] = grids.apply(lambda x: x[0])
-        df['columnas_asientos'] = grids.apply(lambda x: x[1])
+        # Agregar dimensiones de cuadrícula (get_grid una vez por capacidad distinta + gather)
+        codes, caps = pd.factorize(df['max_estudiantes'], use_na_sentinel=False)
+        grid_lut = np.array([self.grid_config.get_grid(cap) for cap in caps], dtype=np.int64).reshape(-1, 2)
+        grids = grid_lut[codes]
+        df['filas_asientos'] = grids[:, 0]
+        df['columnas_asientos'] = grids[:, 1]
         
         # Renombrar columnas para consistencia
         df = df.rename(columns={
@@ -47,6 +95,18 @@ class DataProcessor:
         
         return df
     
+    # "HH:MM" (mismos formatos que acepta int() en _calcular_duracion)
+    _HORA_RE = r'^\s*([+-]?\d+)\s*:\s*([+-]?\d+)\s*$'
+    
+    @classmethod
+    def _calcular_duraciones(cls, inicio: pd.Series, fin: pd.Series) -> pd.Series:
+        """Versión vectorizada de _calcular_duracion (2 horas si algún horario es inválido)."""
+        def minutos(horario: pd.Series) -> pd.Series:
+            partes = horario.astype(str).str.extract(cls._HORA_RE).astype(float)
+            return partes[0] * 60 + partes[1]
+        
+        return ((minutos(fin) - minutos(inicio)) / 60.0).fillna(2.0)
+    
     @staticmethod
     def _calcular_duracion(inicio: str, fin: str) -> float:
 
@@ -58,5 +118,14 @@ class DataProcessor:
             return 2.0  # Por defecto 2 horas
     
     @staticmethod
-    def filter_by_day(df: pd.DataFrame, dia_nombre: str) -> pd.DataFrame:
+    def create_day_index(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Particiona df por dia_semana en una sola pasada (groupby, orden de filas intacto)."""
+        return {dia: group for dia, group in df.groupby('dia_semana', sort=False)}
+    
+    @staticmethod
+    def filter_by_day(df: pd.DataFrame, dia_nombre: str,
+                      day_index: Optional[Dict[str, pd.DataFrame]] = None) -> pd.DataFrame:
+        """Filas del día: desde day_index (create_day_index) sin recorrer df, o con máscara si no hay índice."""
+        if day_index is not None:
+            return day_index.get(dia_nombre, df.iloc[:0])
         return df[df['dia_semana'] == dia_nombre].copy()
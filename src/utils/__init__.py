@@ -1,5 +1,5 @@
 """Utility module - Helper functions."""
 
-from .helpers import DirectoryManager
+from .helpers import DirectoryManager, top_k_indices
 
-__all__ = ['DirectoryManager']
+__all__ = ['DirectoryManager', 'top_k_indices']
@@ -1,7 +1,9 @@
 """Utility functions and helpers."""
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import numpy as np
 
 
 class DirectoryManager:
@@ -10,13 +12,62 @@ class DirectoryManager:
     def clean_and_create(base_dir: Path):
         """Clean and recreate output directory structure."""
         if base_dir.exists():
-            shutil.rmtree(base_dir)
+            if os.name == 'posix':
+                DirectoryManager._parallel_rmtree(base_dir)
+            else:
+                shutil.rmtree(base_dir)
         
         base_dir.mkdir(parents=True, exist_ok=True)
         (base_dir / 'grafos_diarios').mkdir(exist_ok=True)
         (base_dir / 'epidemia').mkdir(exist_ok=True)
     
+    @staticmethod
+    def _parallel_rmtree(path: Path, workers: int = 8):
+        """
+        Remove a directory tree unlinking files from a thread pool.
+        
+        unlink is a syscall that releases the GIL, so the files of the
+        tree are removed concurrently; directories are removed bottom-up
+        once their files are gone. Symlinks are unlinked, never followed.
+        """
+        files, dirs = [], []
+        pending = [path]
+        while pending:
+            current = pending.pop()
+            dirs.append(current)
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(Path(entry.path))
+                    else:
+                        files.append(entry.path)
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(os.unlink, files))  # list() propagates errors
+        
+        for directory in reversed(dirs):
+            os.rmdir(directory)
+    
     @staticmethod
     def ensure_exists(directory: Path):
         """Ensure directory exists."""
         directory.mkdir(parents=True, exist_ok=True)
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Índices de los k mayores valores en orden descendente, en O(n).
+    
+    Equivale a un sort estable descendente truncado a k (los empates
+    conservan el orden original), pero solo ordena los candidatos.
+    """
+    n = len(values)
+    if k <= 0 or n == 0:
+        return np.array([], dtype=np.intp)
+    if k >= n:
+        return np.argsort(-values, kind='stable')
+    
+    threshold = np.partition(values, n - k)[n - k]  # k-ésimo mayor
+    candidates = np.flatnonzero(values >= threshold)
+    order = np.argsort(-values[candidates], kind='stable')
+    return candidates[order][:k]
@@ -2,6 +2,16 @@
 import logging
 import sys
 from pathlib import Path
+from typing import Dict
+
+# Formato compartido por todos los handlers de consola
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Loggers ya configurados por get_logger (evita repetir setup_logger por módulo)
+_LOGGERS: Dict[str, logging.Logger] = {}
 
 
 def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
@@ -26,13 +36,7 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     # Handler para consola
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
-    
-    # Formato
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
     
     logger.addHandler(console_handler)
     
@@ -40,5 +44,8 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
 
 
 def get_logger(name: str) -> logging.Logger:
-    """Obtiene un logger configurado."""
-    return setup_logger(name)
+    """Obtiene un logger configurado (memoizado por nombre)."""
+    logger = _LOGGERS.get(name)
+    if logger is None:
+        logger = _LOGGERS[name] = setup_logger(name)
+    return logger
@@ -0,0 +1,99 @@
+"""Rasterización de aristas con NumPy para grafos grandes (una imagen en lugar de miles de líneas)."""
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
+from typing import Dict, Optional, Tuple
+import networkx as nx
+
+
+class RasterGraphRenderer:
+    """
+    Dibuja las aristas de un grafo como una sola imagen RGBA.
+    
+    Cada arista se muestrea con un punto por píxel (DDA) y los píxeles se
+    acumulan con bincount; la transparencia total de k líneas superpuestas
+    es 1 - (1 - alpha)^k, como al componer k líneas semitransparentes.
+    La resolución se elige para que un píxel tenga el ancho de una línea.
+    """
+    
+    PAD = 0.05  # Relleno relativo de la caja de posiciones (el mismo que usa draw_networkx_edges)
+    CHUNK_EDGES = 1024  # Aristas por bloque (acota la memoria de los puntos muestreados)
+    
+    def __init__(self, figsize: Tuple[float, float], line_width: float):
+        # Píxeles por pulgada tales que 1 píxel = line_width puntos
+        px_per_inch = 72.0 / line_width
+        self.width = max(int(figsize[0] * px_per_inch), 1)
+        self.height = max(int(figsize[1] * px_per_inch), 1)
+    
+    def render(self, G: nx.Graph, pos: Dict, color: str, alpha: float,
+               weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Tuple[float, float, float, float]]:
+        """
+        Rasteriza las aristas de G.
+        
+        Args:
+            G: Grafo (se usan G.edges() en su orden)
+            pos: Posiciones {nodo: (x, y)}
+            color: Color de las aristas
+            alpha: Opacidad de una arista de peso 1
+            weights: Peso relativo por arista (None = 1); suma al acumular
+        
+        Returns:
+            (imagen RGBA uint8 de (alto, ancho, 4), extent (x0, x1, y0, y1))
+        """
+        nodes = list(G.nodes())
+        node_idx = {n: i for i, n in enumerate(nodes)}
+        xy = np.array([pos[n] for n in nodes], dtype=float).reshape(-1, 2)
+        edges = np.array([(node_idx[u], node_idx[v]) for u, v in G.edges()],
+                         dtype=np.int64).reshape(-1, 2)
+        
+        # Extent = caja de las posiciones con relleno (imshow y los nodos comparten coordenadas)
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        span = np.where(hi > lo, hi - lo, 1.0)
+        lo, hi = lo - self.PAD * span, hi + self.PAD * span
+        
+        # Coordenadas en píxeles de los extremos (centros de píxel en 0 .. ancho-1)
+        scale = np.array([self.width - 1, self.height - 1]) / (hi - lo)
+        p0 = (xy[edges[:, 0]] - lo) * scale
+        p1 = (xy[edges[:, 1]] - lo) * scale
+        half = 0.5 / scale
+        extent = (lo[0] - half[0], hi[0] + half[0], lo[1] - half[1], hi[1] + half[1])
+        
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+        counts = np.zeros(self.width * self.height)
+        for start in range(0, len(edges), self.CHUNK_EDGES):
+            chunk = slice(start, start + self.CHUNK_EDGES)
+            self._accumulate(counts, p0[chunk], p1[chunk],
+                             None if weights is None else weights[chunk])
+        
+        image = np.zeros((self.height * self.width, 4), dtype=np.uint8)
+        image[:, :3] = (np.array(to_rgba(color)[:3]) * 255).astype(np.uint8)
+        image[:, 3] = ((1.0 - (1.0 - alpha) ** counts) * 255).astype(np.uint8)
+        
+        return image.reshape(self.height, self.width, 4), extent
+    
+    def _accumulate(self, counts: np.ndarray, p0: np.ndarray, p1: np.ndarray,
+                    weights: Optional[np.ndarray]):
+        """Suma en counts los píxeles de los segmentos p0 → p1 (DDA: un punto por píxel del eje mayor)."""
+        length = np.abs(p1 - p0).max(axis=1)
+        n_samples = np.floor(length).astype(np.int64) + 1
+        seg = np.repeat(np.arange(len(p0)), n_samples)
+        step = np.arange(n_samples.sum()) - np.repeat(np.cumsum(n_samples) - n_samples, n_samples)
+        t = step / np.maximum(length, 1.0)[seg]
+        
+        x = np.rint(p0[seg, 0] + t * (p1[seg, 0] - p0[seg, 0])).astype(np.int64)
+        y = np.rint(p0[seg, 1] + t * (p1[seg, 1] - p0[seg, 1])).astype(np.int64)
+        counts += np.bincount(y * self.width + x,
+                              weights=None if weights is None else weights[seg],
+                              minlength=len(counts))
+    
+    def draw(self, G: nx.Graph, pos: Dict, color: str, alpha: float,
+             weights: Optional[np.ndarray] = None):
+        """Rasteriza las aristas y las dibuja en los ejes actuales con imshow."""
+        image, extent = self.render(G, pos, color, alpha, weights)
+        ax = plt.gca()
+        im = ax.imshow(image, extent=extent, origin='lower', aspect='auto', zorder=0,
+                       interpolation='nearest')
+        # Sin bordes "pegajosos": los límites de los ejes llevan el mismo margen que con líneas
+        im.sticky_edges.x.clear()
+        im.sticky_edges.y.clear()
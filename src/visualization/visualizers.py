@@ -1,11 +1,15 @@
 """Módulo de visualización usando patrones Template Method y Strategy."""
 import matplotlib.pyplot as plt
+import multiprocessing as mp
 import networkx as nx
+import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from abc import ABC, abstractmethod
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 from ..core.config import VIZ_CONFIG
+from .raster import RasterGraphRenderer
 
 
 class GraphVisualizer(ABC):
@@ -33,6 +37,15 @@ class GraphVisualizer(ABC):
         # Usa layout aleatorio en lugar de spring para evitar dependencia scipy
         return nx.random_layout(G, seed=42)
     
+    def _use_raster(self, G: nx.Graph) -> bool:
+        """Grafos grandes: aristas como una imagen en lugar de una línea por arista."""
+        return G.number_of_nodes() > self.config.raster_min_nodes
+    
+    def _draw_edges_raster(self, G: nx.Graph, pos: Dict, color: str, alpha: float, weights=None):
+        """Dibuja las aristas rasterizadas (1 píxel = edge_width puntos)."""
+        renderer = RasterGraphRenderer(self.config.figsize, self.config.edge_width)
+        renderer.draw(G, pos, color, alpha, weights)
+    
     @abstractmethod
     def _draw_edges(self, G: nx.Graph, pos: Dict):
         """Dibuja aristas (debe ser implementado por subclases)."""
@@ -60,6 +73,10 @@ class BasicGraphVisualizer(GraphVisualizer):
     """Visualiza grafo básico de contacto."""
     
     def _draw_edges(self, G: nx.Graph, pos: Dict):
+        if self._use_raster(G):
+            self._draw_edges_raster(G, pos, self.config.color_edge, self.config.edge_alpha)
+            return
+        
         nx.draw_networkx_edges(
             G, pos, 
             alpha=self.config.edge_alpha,
@@ -84,6 +101,12 @@ class WeightedGraphVisualizer(GraphVisualizer):
         max_w = max(weights) if weights else 1
         widths = [3 * (w / max_w) for w in weights]
         
+        if self._use_raster(G):
+            # Cada arista aporta opacidad según su ancho (en píxeles de edge_width puntos)
+            self._draw_edges_raster(G, pos, '#888888', 0.4,
+                                    np.array(widths) / self.config.edge_width)
+            return
+        
         nx.draw_networkx_edges(
             G, pos,
             width=widths,
@@ -109,6 +132,10 @@ class EpidemicGraphVisualizer(GraphVisualizer):
         self.nuevos = nuevos
     
     def _draw_edges(self, G: nx.Graph, pos: Dict):
+        if self._use_raster(G):
+            self._draw_edges_raster(G, pos, self.config.color_edge, 0.2)
+            return
+        
         nx.draw_networkx_edges(
             G, pos,
             alpha=0.2,
@@ -195,26 +222,22 @@ class MSTGraphVisualizer(GraphVisualizer):
         if G.number_of_edges() == 0:
             return
         
-        weights = [G[u][v].get('peso', 1.0) for u, v in G.edges()]
-        max_w = max(weights) if weights else 1
-        min_w = min(weights) if weights else 0
+        # Pesos en un solo recorrido; anchos y colores vectorizados
+        weights = np.fromiter((d.get('peso', 1.0) for _, _, d in G.edges(data=True)),
+                              dtype=float, count=G.number_of_edges())
+        max_w, min_w = weights.max(), weights.min()
         
-        # Normalizar anchos entre 1 y 4
+        # Intensidad normalizada (0.5 si todos los pesos son iguales)
         if max_w > min_w:
-            widths = [1 + 3 * ((w - min_w) / (max_w - min_w)) for w in weights]
+            intensity = (weights - min_w) / (max_w - min_w)
         else:
-            widths = [2.5] * len(weights)
+            intensity = np.full(len(weights), 0.5)
+        
+        # Normalizar anchos entre 1 y 4 (2.5 con pesos iguales)
+        widths = (1 + 3 * intensity).tolist()
         
-        # Colores según peso (verde = fuerte, amarillo = débil)
-        edge_colors = []
-        for w in weights:
-            if max_w > min_w:
-                intensity = (w - min_w) / (max_w - min_w)
-            else:
-                intensity = 0.5
-            # Verde para contactos fuertes, amarillo para débiles
-            color = plt.cm.YlGn(0.3 + 0.7 * intensity)
-            edge_colors.append(color)
+        # Colores según peso (verde = fuerte, amarillo = débil): RGBA (E, 4) en una llamada
+        edge_colors = plt.cm.YlGn(0.3 + 0.7 * intensity)
         
         nx.draw_networkx_edges(
             G, pos,
@@ -224,10 +247,10 @@ class MSTGraphVisualizer(GraphVisualizer):
         )
     
     def _draw_nodes(self, G: nx.Graph, pos: Dict):
-        # Colorear nodos por grado (nodos hub)
-        degrees = dict(G.degree())
-        max_degree = max(degrees.values()) if degrees else 1
-        node_colors = [degrees.get(n, 0) for n in G.nodes()]
+        # Colorear nodos por grado (nodos hub); G.degree() sigue el orden de G.nodes()
+        node_colors = np.fromiter((d for _, d in G.degree()), dtype=np.int64,
+                                  count=G.number_of_nodes())
+        max_degree = node_colors.max() if len(node_colors) else 1
         
         nx.draw_networkx_nodes(
             G, pos,
@@ -242,6 +265,14 @@ class MSTGraphVisualizer(GraphVisualizer):
         )
 
 
+def _visualize_day_worker(config, dia: str, G: nx.Graph, mst: Optional[nx.Graph], output_dir: Path):
+    """Secuencia de visualizaciones de un día en un proceso del pool (backend sin pantalla)."""
+    plt.switch_backend('Agg')
+    facade = VisualizationFacade(config)
+    facade.visualize_day(G, dia, output_dir, mst)
+    return dia
+
+
 class VisualizationFacade:
     """Fachada para todas las operaciones de visualización (Patrón Fachada)."""
     
@@ -263,6 +294,44 @@ class VisualizationFacade:
         output_path = output_dir / f"{dia.lower()}_pesos.png"
         visualizer.visualize(G, output_path, title)
     
+    def visualize_day(self, G: nx.Graph, dia: str, output_dir: Path, mst: Optional[nx.Graph] = None):
+        """Visualiza el grafo del día (básico y con pesos) y su MST si se pasa."""
+        self.visualize_daily_graph(G, dia, output_dir)
+        self.visualize_weighted_graph(G, dia, output_dir)
+        if mst is not None:
+            self.visualize_mst(mst, dia, output_dir)
+    
+    def visualize_all_days_parallel(self,
+                                    daily_graphs: Dict[str, nx.Graph],
+                                    output_dir: Path,
+                                    msts: Optional[Dict[str, nx.Graph]] = None,
+                                    n_workers: Optional[int] = None):
+        """
+        Visualiza todos los días en paralelo, un proceso por día (los días son independientes).
+        
+        Los procesos se crean con 'spawn' (matplotlib no es seguro tras fork);
+        con un solo worker o un solo día se dibuja en el proceso actual.
+        
+        Args:
+            daily_graphs: {dia: grafo del día}
+            output_dir: Directorio de salida
+            msts: {dia: MST del día} (opcional)
+            n_workers: Procesos del pool (por defecto, min(días, CPUs))
+        """
+        msts = msts or {}
+        n_workers = n_workers or min(len(daily_graphs), os.cpu_count() or 1)
+        
+        if n_workers <= 1 or len(daily_graphs) <= 1:
+            for dia, G in daily_graphs.items():
+                self.visualize_day(G, dia, output_dir, msts.get(dia))
+            return
+        
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('spawn')) as pool:
+            futures = [pool.submit(_visualize_day_worker, self.config, dia, G, msts.get(dia), output_dir)
+                       for dia, G in daily_graphs.items()]
+            for future in futures:
+                future.result()  # Propagar excepciones de los workers
+    
     def visualize_epidemic_state(self, 
                                  G: nx.Graph,
                                  estados: Dict[int, int],